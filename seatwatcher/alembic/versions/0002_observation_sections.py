@@ -0,0 +1,16 @@
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002_observation_sections'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+	op.add_column('observations', sa.Column('sections_blob', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+	op.drop_column('observations', 'sections_blob')
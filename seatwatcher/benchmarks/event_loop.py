@@ -0,0 +1,128 @@
+"""
+Compare event loop implementations on the same monitor workload.
+
+Each loop runs in a fresh interpreter: ``--monitors`` dummy-provider monitors polling
+every second for ``--seconds``, recording observations into a temporary SQLite DB
+(thresholds are set so nothing is notified). We report observations recorded, CPU
+time per 1k observations, and event-loop lag (how late a 50 ms ticker wakes up).
+
+Usage:
+    python benchmarks/event_loop.py [--monitors 2000] [--seconds 20] [--loops asyncio,uvloop]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _child(loop: str, monitors: int, seconds: float, executor_workers: int | None) -> None:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, root)
+    from seatwatcher.config import Config
+    from seatwatcher.db import get_engine, init_engine, session_scope
+    from seatwatcher.logging_utils import configure_logging
+    from seatwatcher.models import Base, Observation
+    from seatwatcher.runtime import run_async
+    from seatwatcher.watcher import WatcherService
+    from sqlalchemy import func, select
+
+    configure_logging("WARNING")
+    with tempfile.TemporaryDirectory() as tmp:
+        init_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(get_engine())
+        cfg = Config(
+            app={"log_level": "WARNING"},
+            database={"url": "unused"},
+            provider={"type": "dummy"},
+            notifiers={"console": {"type": "console"}},
+            monitors=[
+                {
+                    "name": f"m{i}",
+                    "match_id": f"MATCH-{i}",
+                    "seat_threshold_min": 10**9,
+                    "poll_interval_seconds": 1,
+                    "channels": ["console"],
+                }
+                for i in range(monitors)
+            ],
+        )
+        service = WatcherService(cfg)
+        lags: list[float] = []
+
+        async def _ticker() -> None:
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.05)
+                lags.append(time.perf_counter() - start - 0.05)
+
+        async def _main() -> None:
+            ticker = asyncio.create_task(_ticker())
+            try:
+                await asyncio.wait_for(service.run(), timeout=seconds)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                ticker.cancel()
+
+        cpu_start = time.process_time()
+        run_async(_main(), loop=loop, executor_workers=executor_workers)
+        cpu = time.process_time() - cpu_start
+        with session_scope() as session:
+            observations = session.execute(select(func.count()).select_from(Observation)).scalar_one()
+
+    lags.sort()
+    print(
+        json.dumps(
+            {
+                "loop": loop,
+                "observations": observations,
+                "cpu_seconds": cpu,
+                "cpu_ms_per_1k_obs": 1e6 * cpu / max(1, observations),
+                "lag_p50_ms": 1000 * statistics.median(lags) if lags else 0.0,
+                "lag_p99_ms": 1000 * lags[int(0.99 * (len(lags) - 1))] if lags else 0.0,
+            }
+        )
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--monitors", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--loops", default="asyncio,uvloop")
+    parser.add_argument("--executor-workers", type=int, default=None)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.monitors, args.seconds, args.executor_workers)
+        return 0
+
+    print(f"{'loop':<8} {'observations':>12} {'cpu s':>7} {'cpu ms/1k obs':>14} {'lag p50 ms':>11} {'lag p99 ms':>11}")
+    for loop in [l.strip() for l in args.loops.split(",") if l.strip()]:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", loop,
+               "--monitors", str(args.monitors), "--seconds", str(args.seconds)]
+        if args.executor_workers:
+            cmd += ["--executor-workers", str(args.executor_workers)]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{loop:<8} failed:\n{proc.stderr}", file=sys.stderr)
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{r['loop']:<8} {r['observations']:>12} {r['cpu_seconds']:>7.2f} {r['cpu_ms_per_1k_obs']:>14.1f}"
+            f" {r['lag_p50_ms']:>11.2f} {r['lag_p99_ms']:>11.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
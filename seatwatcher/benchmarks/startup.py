@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark for the CLI.
+
+Runs ``python -X importtime`` in fresh interpreters and reports how long importing
+``seatwatcher.cli`` takes, plus which heavy third-party modules a lightweight command
+would drag in. Exits non-zero if the median exceeds ``--max-ms`` or a forbidden module
+is imported eagerly, so it can guard against regressions in CI.
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--max-ms 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+
+# None of these are needed just to parse the config and start a console notifier
+HEAVY_MODULES = ("sqlalchemy", "httpx", "jmespath", "aiosmtplib", "numpy")
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.*)$")
+
+_PROBE = (
+    "import sys, seatwatcher.cli, seatwatcher.factory;"
+    "print(','.join(m for m in {mods!r} if m in sys.modules))"
+)
+
+
+def _run_once(root: str) -> tuple[float, list[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(mods=HEAVY_MODULES)],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match and match.group(3).strip() == "seatwatcher.cli":
+            cumulative_us = int(match.group(2))
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative_us / 1000.0, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=300.0, help="Fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # The first run warms the bytecode and OS caches; it is not counted
+    _run_once(root)
+    timings = []
+    loaded: list[str] = []
+    for _ in range(args.runs):
+        ms, loaded = _run_once(root)
+        timings.append(ms)
+
+    median = statistics.median(timings)
+    print(f"seatwatcher.cli import: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms")
+    print(f"heavy modules imported eagerly: {', '.join(loaded) or 'none'}")
+    failed = False
+    if loaded:
+        print("FAIL: heavy modules must be imported lazily", file=sys.stderr)
+        failed = True
+    if median > args.max_ms:
+        print(f"FAIL: median import time {median:.1f} ms exceeds budget {args.max_ms:.1f} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
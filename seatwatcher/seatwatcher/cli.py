@@ -1,18 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import os
+from datetime import datetime, timezone
 from typing import Optional
 
 import click
-from sqlalchemy import text
 
 from .config import load_config
-from .db import get_engine, init_engine
+from .db import get_engine, init_engine, session_scope
 from .logging_utils import configure_logging, get_logger
-from .models import Base
-from .watcher import WatcherService
-from .factory import build_notifier
+
+# Heavier modules (SQLAlchemy models, the watcher, provider/notifier clients) are
+# imported inside the commands that need them to keep CLI cold start fast.
 
 
 logger = get_logger(__name__)
@@ -23,7 +24,13 @@ logger = get_logger(__name__)
 @click.pass_context
 def cli(ctx: click.Context, config_path: str) -> None:
     cfg = load_config(config_path)
-    configure_logging(cfg.app.log_level)
+    log = cfg.app.logging
+    configure_logging(
+        cfg.app.log_level,
+        fmt=log.format,
+        use_queue=log.queue,
+        limits={name: limit.model_dump(exclude_none=True) for name, limit in log.limits.items()},
+    )
     init_engine(cfg.database.url)
     ctx.ensure_object(dict)
     ctx.obj["cfg"] = cfg
@@ -38,6 +45,8 @@ def init_db(ctx: click.Context) -> None:
     Why: For simple deployments, table creation via ORM metadata is sufficient. We
     also support Alembic migrations separately for schema evolution.
     """
+    from .models import Base
+
     engine = get_engine()
     Base.metadata.create_all(engine)
     click.echo("Database initialized")
@@ -65,12 +74,25 @@ def upgrade_db(ctx: click.Context, revision: str) -> None:
 
 
 @cli.command("run")
+@click.option("--loop", "loop_kind", type=click.Choice(["asyncio", "uvloop", "auto"]), default=None, help="Event loop implementation; overrides app.runtime.loop")
+@click.option("--executor-workers", type=int, default=None, help="Threads for blocking work; overrides app.runtime.executor_workers")
+@click.option("--loop-debug/--no-loop-debug", default=None, help="Log slow event-loop callbacks; overrides app.runtime.debug")
 @click.pass_context
-def run(ctx: click.Context) -> None:
+def run(ctx: click.Context, loop_kind: Optional[str], executor_workers: Optional[int], loop_debug: Optional[bool]) -> None:
+    from .runtime import run_async
+    from .watcher import WatcherService
+
     cfg = ctx.obj["cfg"]
+    rt = cfg.app.runtime
     service = WatcherService(cfg)
     try:
-        asyncio.run(service.run())
+        run_async(
+            service.run(),
+            loop=loop_kind or rt.loop,
+            executor_workers=executor_workers if executor_workers is not None else rt.executor_workers,
+            debug=loop_debug if loop_debug is not None else rt.debug,
+            slow_callback_seconds=rt.slow_callback_seconds,
+        )
     except KeyboardInterrupt:
         logger.info("Shutting down")
 
@@ -81,19 +103,256 @@ def run(ctx: click.Context) -> None:
 @click.option("--channels", default="", help="Comma-separated notifier names to use; default uses all in first monitor")
 @click.pass_context
 def test_notify(ctx: click.Context, subject: str, body: str, channels: str) -> None:
+    from .factory import build_notifier
+
     cfg = ctx.obj["cfg"]
     if channels:
         channel_list = [c.strip() for c in channels.split(",") if c.strip()]
     else:
         channel_list = cfg.monitors[0].channels
-    notifier = build_notifier(cfg, channel_list)
+    # A digest would hold the message for its whole window before sending
+    notifier = build_notifier(cfg, channel_list, digests=False)
+    asyncio.run(notifier.send_all(subject=subject, message=body))
+    click.echo("Test notification sent")
 
-    async def _run() -> None:
-        await notifier.send_all(subject=subject, message=body)
 
-    asyncio.run(_run())
-    click.echo("Test notification sent")
+@cli.command("history")
+@click.option("--match-id", required=True)
+@click.option("--window", type=float, default=300.0, show_default=True, help="Seconds of history to summarize")
+@click.option("--threshold", type=int, default=None, help="Also report seconds spent at or above this many seats")
+@click.option("--samples", is_flag=True, help="Include the raw recent samples")
+@click.option("--url", default=None, help="Metrics endpoint of the running watcher; default from app.metrics")
+@click.pass_context
+def history(
+    ctx: click.Context, match_id: str, window: float, threshold: Optional[int], samples: bool, url: Optional[str]
+) -> None:
+    """Query a running watcher's in-memory observation history for one match."""
+    from urllib.error import HTTPError, URLError
+    from urllib.parse import urlencode
+    from urllib.request import urlopen
+
+    if url is None:
+        m = ctx.obj["cfg"].app.metrics
+        host = "127.0.0.1" if m.host in ("0.0.0.0", "::") else m.host
+        url = f"http://{host}:{m.port}"
+    params: dict[str, object] = {"match_id": match_id, "window": window}
+    if threshold is not None:
+        params["threshold"] = threshold
+    if samples:
+        params["samples"] = 1
+    try:
+        with urlopen(f"{url.rstrip('/')}/debug/history?{urlencode(params)}", timeout=5) as resp:
+            click.echo(json.dumps(json.loads(resp.read()), indent=2))
+    except HTTPError as exc:
+        raise click.ClickException(f"{exc.code}: {exc.read().decode('utf-8', 'replace')}")
+    except URLError as exc:
+        raise click.ClickException(f"Cannot reach watcher metrics endpoint at {url}: {exc.reason}")
+
+
+def _parse_int_list(raw: str) -> list[Optional[int]]:
+    values = [int(v) for v in raw.split(",") if v.strip()]
+    return values or [None]
+
+
+@cli.command("export-observations")
+@click.option("--output", required=True, type=click.Path(dir_okay=False, writable=True))
+@click.pass_context
+def export_observations(ctx: click.Context, output: str) -> None:
+    """Export all observations to CSV for offline replay."""
+    from .replay import export_observations_csv
+
+    with session_scope() as session:
+        count = export_observations_csv(session, output)
+    click.echo(f"Exported {count} observations to {output}")
+
+
+@cli.command("export-sections")
+@click.option("--output", required=True, type=click.Path(dir_okay=False, writable=True))
+@click.option("--match-id", "match_ids", multiple=True, help="Only export these matches (repeatable)")
+@click.option("--since", type=click.DateTime(), default=None, help="Only export snapshots at or after this UTC time")
+@click.option("--until", type=click.DateTime(), default=None, help="Only export snapshots before this UTC time")
+@click.pass_context
+def export_sections(
+    ctx: click.Context, output: str, match_ids: tuple[str, ...], since: Optional[datetime], until: Optional[datetime]
+) -> None:
+    """Decode per-section snapshots to long-format CSV (created_at, match_id, section, seats)."""
+    import csv
+
+    from .repository import iter_section_snapshots
+    from .utils.sections import decode_sections
+
+    count = 0
+    with session_scope() as session, open(output, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["created_at", "match_id", "section", "seats"])
+        for created_at, match_id, blob in iter_section_snapshots(session, match_ids or None, since, until):
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            for section, seats in decode_sections(blob).items():
+                writer.writerow([created_at.isoformat(), match_id, section, seats])
+            count += 1
+    click.echo(f"Exported {count} section snapshots to {output}")
+
+
+@cli.command("replay")
+@click.option("--source-file", type=click.Path(exists=True), default=None, help="CSV from export-observations; default reads the DB")
+@click.option("--since", type=click.DateTime(), default=None, help="Only replay observations at or after this UTC time")
+@click.option("--until", type=click.DateTime(), default=None, help="Only replay observations before this UTC time")
+@click.option("--thresholds", default="", help="Comma-separated seat_threshold_min values to sweep; default uses each monitor's")
+@click.option("--intervals", default="", help="Comma-separated min_notify_interval_seconds values to sweep; default uses each monitor's")
+@click.option("--json", "as_json", is_flag=True, help="Emit results as JSON lines")
+@click.pass_context
+def replay_cmd(
+    ctx: click.Context,
+    source_file: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    thresholds: str,
+    intervals: str,
+    as_json: bool,
+) -> None:
+    """
+    Replay recorded observations through the threshold and dedup logic.
+
+    Monitors with edge-triggered or sustained ``rules``, or with ``sections``, are
+    skipped with a warning.
+
+    Why: Time is virtual (taken from the observations themselves) and evaluation is
+    vectorized, so months of history can be used to compare settings in seconds
+    instead of trying them live.
+    """
+    from .replay import load_observations_from_csv, load_observations_from_db, replay
+
+    cfg = ctx.obj["cfg"]
+    match_ids = sorted({m.match_id for m in cfg.monitors})
+    if source_file:
+        columns = load_observations_from_csv(source_file, match_ids).window(since, until)
+    else:
+        with session_scope() as session:
+            columns = load_observations_from_db(session, match_ids, since=since, until=until)
+
+    results = replay(
+        columns,
+        cfg.monitors,
+        _parse_int_list(thresholds),
+        _parse_int_list(intervals),
+        channel_types={name: n.type for name, n in cfg.notifiers.items()},
+    )
+    if results and results[0].skipped_monitors:
+        click.echo(
+            "Skipping monitors replay cannot model (only 'seats >= N' on the whole venue is replayed): "
+            + ", ".join(results[0].skipped_monitors),
+            err=True,
+        )
+    if not as_json:
+        click.echo(f"Replayed {len(columns)} observations across {len(columns.match_ids)} matches")
+    for result in results:
+        if as_json:
+            click.echo(json.dumps(result.__dict__))
+            continue
+        threshold = "monitor" if result.seat_threshold_min is None else result.seat_threshold_min
+        interval = "monitor" if result.min_notify_interval_seconds is None else result.min_notify_interval_seconds
+        per_channel = " ".join(f"{ch}={n}" for ch, n in sorted(result.alerts_per_channel.items()))
+        click.echo(f"threshold={threshold} interval={interval} alerts={result.alerts} {per_channel}")
+
+
+@cli.command("soak")
+@click.option("--duration", type=float, default=3600.0, show_default=True, help="Seconds to run")
+@click.option("--monitors", type=int, default=100, show_default=True, help="Synthetic monitors to run")
+@click.option("--fake-http", is_flag=True, help="Poll a local fake HTTP provider instead of the dummy provider")
+@click.option("--scenario", "scenario_file", type=click.Path(exists=True), default=None, help="Use the simulation provider with this scenario file")
+@click.option("--poll-scale", type=float, default=0.1, show_default=True, help="Multiplier on the 1s poll interval")
+@click.option("--sample-every", type=float, default=30.0, show_default=True, help="Seconds between resource samples")
+@click.option("--warmup", type=float, default=60.0, show_default=True, help="Seconds excluded from growth checks")
+@click.option("--top", type=int, default=10, show_default=True, help="Growing allocation sites to report")
+@click.option("--max-rss-growth-mb", type=float, default=64.0, show_default=True)
+@click.option("--max-traced-growth-mb", type=float, default=32.0, show_default=True)
+@click.option("--max-fd-growth", type=int, default=16, show_default=True)
+@click.option("--max-socket-growth", type=int, default=16, show_default=True)
+@click.option("--max-task-growth", type=int, default=32, show_default=True)
+@click.option("--max-pool-growth", type=int, default=2, show_default=True)
+@click.option("--report", "report_path", type=click.Path(), default=None, help="Write the full report as JSON")
+@click.pass_context
+def soak_cmd(
+    ctx: click.Context,
+    duration: float,
+    monitors: int,
+    fake_http: bool,
+    scenario_file: Optional[str],
+    poll_scale: float,
+    sample_every: float,
+    warmup: float,
+    top: int,
+    max_rss_growth_mb: float,
+    max_traced_growth_mb: float,
+    max_fd_growth: int,
+    max_socket_growth: int,
+    max_task_growth: int,
+    max_pool_growth: int,
+    report_path: Optional[str],
+) -> None:
+    """
+    Run the watcher on a synthetic workload and fail if resources keep growing.
+
+    Uses the configured database (point --config at a scratch one) and runtime
+    settings; monitors and the provider are generated. Exits 1 when RSS, traced
+    Python memory, file descriptors, sockets, asyncio tasks or DB pool checkouts are
+    still rising past their limits at the end of the run.
+    """
+    from .runtime import run_async
+    from .soak import ResourceSample, SoakLimits, run_soak
+
+    cfg = ctx.obj["cfg"]
+    limits = SoakLimits(
+        rss_bytes=max_rss_growth_mb * 1024 * 1024,
+        traced_bytes=max_traced_growth_mb * 1024 * 1024,
+        fds=max_fd_growth,
+        sockets=max_socket_growth,
+        tasks=max_task_growth,
+        pool_checkouts=max_pool_growth,
+    )
+
+    def _echo(s: ResourceSample) -> None:
+        rss = f"{s.rss_bytes / 1048576:.1f}MB" if s.rss_bytes is not None else "n/a"
+        click.echo(
+            f"[{s.elapsed_seconds:>8.0f}s] rss={rss} traced={s.traced_bytes / 1048576:.1f}MB "
+            f"fds={s.fds} sockets={s.sockets} tasks={s.tasks} pool={s.pool_checkouts}"
+        )
+
+    rt = cfg.app.runtime
+    report = run_async(
+        run_soak(
+            cfg,
+            duration_seconds=duration,
+            monitors=monitors,
+            fake_http=fake_http,
+            scenario_file=scenario_file,
+            poll_interval_scale=poll_scale,
+            sample_every_seconds=sample_every,
+            warmup_seconds=warmup,
+            top=top,
+            limits=limits,
+            on_sample=_echo,
+        ),
+        loop=rt.loop,
+        executor_workers=rt.executor_workers,
+    )
+    click.echo(f"Observations: {report.observations}")
+    for name, growth in report.growth.items():
+        click.echo(f"Growth {name}: {growth:,.0f}")
+    if report.top_growth:
+        click.echo("Top growing allocation sites:")
+        for line in report.top_growth:
+            click.echo(f"  {line}")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as fh:
+            json.dump(report.to_dict(), fh, indent=2)
+    if not report.ok:
+        for failure in report.failures:
+            click.echo(f"FAIL: {failure}", err=True)
+        ctx.exit(1)
+    click.echo("PASS")
 
 
 if __name__ == "__main__":  # pragma: no cover
-    cli()
\ No newline at end of file
+    cli()
@@ -2,23 +2,79 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
 import yaml
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, field_validator, model_validator
 
+from .rules import Rule, parse_rule, threshold_rule
 from .utils.envsubst import env_substitute
 
 
+class MetricsConfig(BaseModel):
+    # Serve a JSON /metrics document from inside `seatwatcher run`
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = 9100
+
+
+class RuntimeConfig(BaseModel):
+    # "auto" uses uvloop when installed and falls back to asyncio otherwise
+    loop: Literal["asyncio", "uvloop", "auto"] = "asyncio"
+    # Threads for blocking work (DB writes); None keeps Python's default sizing
+    executor_workers: Optional[int] = None
+    # Log callbacks that block the event loop longer than slow_callback_seconds
+    debug: bool = False
+    slow_callback_seconds: float = 0.1
+
+
+class HistoryConfig(BaseModel):
+    # Recent samples kept in memory per match (~12 bytes each)
+    capacity: int = Field(default=64, ge=1)
+
+
+class LogLimitConfig(BaseModel):
+    # Token bucket: at most rate_per_second records (bursts up to `burst`)
+    rate_per_second: Optional[float] = Field(default=None, gt=0)
+    burst: Optional[int] = Field(default=None, ge=1)
+    # Keep this fraction of records, chosen at random
+    sample_rate: Optional[float] = Field(default=None, gt=0, le=1)
+    # Records above this level always pass
+    max_level: Literal["DEBUG", "INFO", "WARNING"] = "DEBUG"
+
+
+class LoggingConfig(BaseModel):
+    # "json" writes one object per line with monitor/match_id fields where known
+    format: Literal["text", "json"] = "text"
+    # Format and write records on a background thread instead of the caller's
+    queue: bool = True
+    # Per-logger limits for high-frequency records, keyed by logger name
+    limits: Dict[str, LogLimitConfig] = Field(default_factory=dict)
+
+
 class AppConfig(BaseModel):
     timezone: str = Field(default="UTC")
     log_level: str = Field(default="INFO")
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
 
 
 class DatabaseConfig(BaseModel):
     url: str
 
 
+def _validate_headers_json(v: Optional[str]) -> Optional[str]:
+    if not v:
+        return v
+    try:
+        _ = json.loads(v)
+    except Exception as exc:  # noqa: BLE001
+        raise ValueError(f"headers_json is not valid JSON: {exc}")
+    return v
+
+
 # Provider configs
 class DummyProviderConfig(BaseModel):
     seed: int = 42
@@ -26,6 +82,78 @@ class DummyProviderConfig(BaseModel):
     max_seats: int = 10
 
 
+class CurveProfileConfig(BaseModel):
+    """Availability curve for a class of matches; ranges are drawn per match."""
+
+    name: str
+    # Relative share of matches (not pinned via match_ids) that get this profile
+    weight: float = Field(default=1.0, gt=0)
+    # Glob patterns of match_ids always assigned this profile
+    match_ids: List[str] = Field(default_factory=list)
+    # sellout: capacity falls to zero; steady: hovers around `level`; sold_out: zero
+    # apart from releases
+    kind: Literal["sellout", "steady", "sold_out"] = "sellout"
+    capacity: Tuple[int, int] = (100, 1000)
+    sellout_seconds: Tuple[float, float] = (600.0, 3600.0)
+    # Fraction of capacity for `steady`
+    level: Tuple[float, float] = (0.2, 0.6)
+    # Uniform jitter as a fraction of capacity, redrawn every noise_period_seconds
+    noise: float = Field(default=0.02, ge=0)
+    noise_period_seconds: float = Field(default=10.0, gt=0)
+    # Sudden releases (returned or newly opened seats) that then sell out linearly
+    release_rate_per_hour: float = Field(default=0.0, ge=0)
+    release_size: Tuple[int, int] = (10, 100)
+    release_sellout_seconds: float = Field(default=300.0, gt=0)
+    # Section names; each match splits its seats across them in fixed shares
+    sections: List[str] = Field(default_factory=list)
+
+
+class LatencyConfig(BaseModel):
+    # Log-normal body...
+    median_ms: float = Field(default=50.0, ge=0)
+    sigma: float = Field(default=0.5, ge=0)
+    # ...with a Pareto tail for this share of requests
+    tail_probability: float = Field(default=0.01, ge=0, le=1)
+    tail_min_ms: float = Field(default=500.0, ge=0)
+    tail_alpha: float = Field(default=1.5, gt=0)
+    max_ms: float = Field(default=30000.0, gt=0)
+
+
+class FaultConfig(BaseModel):
+    error_rate: float = Field(default=0.0, ge=0, le=1)
+    timeout_rate: float = Field(default=0.0, ge=0, le=1)
+    # How long a timed-out request hangs before failing
+    timeout_seconds: float = Field(default=10.0, ge=0)
+
+
+class ThrottleConfig(BaseModel):
+    # Token bucket shared by all matches; excess requests fail as HTTP 429 would
+    requests_per_second: Optional[float] = Field(default=None, gt=0)
+    burst: int = Field(default=100, ge=1)
+
+
+class ScenarioConfig(BaseModel):
+    seed: int = 0
+    # Curves advance this many scenario seconds per wall-clock second
+    time_scale: float = Field(default=1.0, gt=0)
+    # Releases are drawn at most once per slot
+    release_slot_seconds: float = Field(default=300.0, gt=0)
+    profiles: List[CurveProfileConfig] = Field(
+        default_factory=lambda: [CurveProfileConfig(name="default")], min_length=1
+    )
+    latency: LatencyConfig = Field(default_factory=LatencyConfig)
+    faults: FaultConfig = Field(default_factory=FaultConfig)
+    throttle: ThrottleConfig = Field(default_factory=ThrottleConfig)
+
+
+class SimulationProviderConfig(BaseModel):
+    # Scenario YAML file, or the same structure inline
+    scenario_file: Optional[str] = None
+    scenario: Optional[ScenarioConfig] = None
+    # Overrides the scenario's seed
+    seed: Optional[int] = None
+
+
 class HttpJsonProviderConfig(BaseModel):
     url_template: str
     method: Literal["GET", "POST"] = "GET"
@@ -36,23 +164,90 @@ class HttpJsonProviderConfig(BaseModel):
     headers_json: Optional[str] = None
     headers_env: Optional[str] = None
     body_template: Optional[str] = None
+    # JMESPath yielding {section: seats} or [[section, seats], ...] from the same
+    # response, e.g. "venue.sections[].[name, available]"; enables per-section data
+    sections_jmespath: Optional[str] = None
 
     @field_validator("headers_json")
     @classmethod
     def validate_json(cls, v: Optional[str]) -> Optional[str]:
-        if not v:
-            return v
-        try:
-            _ = json.loads(v)
-        except Exception as exc:  # noqa: BLE001
-            raise ValueError(f"headers_json is not valid JSON: {exc}")
-        return v
+        return _validate_headers_json(v)
+
+
+class SseProviderConfig(BaseModel):
+    # $match_ids is replaced with the comma-separated, URL-quoted subscribed ids
+    # (write it without braces; ${...} is consumed by config env substitution)
+    url_template: str
+    # JMESPath expressions applied to each JSON event (or each item of a JSON array)
+    match_id_jmespath: str = "match_id"
+    seats_jmespath: str = "seats"
+    headers_json: Optional[str] = None
+    headers_env: Optional[str] = None
+    read_timeout_seconds: float = 60.0
+    reconnect_initial_seconds: float = 1.0
+    reconnect_max_seconds: float = 30.0
+    # Poll this endpoint while the stream is down
+    fallback: Optional[HttpJsonProviderConfig] = None
+    fallback_after_seconds: float = 10.0
+    fallback_interval_seconds: float = 15.0
+    # Longer subscription URLs are split across several connections
+    max_url_length: int = Field(default=8000, ge=256)
+
+    @field_validator("headers_json")
+    @classmethod
+    def validate_json(cls, v: Optional[str]) -> Optional[str]:
+        return _validate_headers_json(v)
+
+
+class WebhookProviderConfig(BaseModel):
+    host: str = "0.0.0.0"
+    port: int = 8080
+    path: str = "/webhook/seats"
+    # When either is set, requests must carry an HMAC-SHA256 signature of the body
+    hmac_secret_env: Optional[str] = None
+    hmac_secret_file_env: Optional[str] = None
+    signature_header: str = "X-Seatwatcher-Signature"
+    # Pending request batches before we answer 429
+    max_queue_batches: int = 1000
+    max_batch_updates: int = 10_000
+    max_body_bytes: int = 1_048_576
+
+
+class CircuitBreakerConfig(BaseModel):
+    # Sliding window of recent calls the rates are computed over
+    window_size: int = 20
+    min_calls: int = 10
+    error_rate_threshold: float = 0.5
+    # Calls at least this slow count towards the slow-call rate
+    slow_call_seconds: float = 5.0
+    slow_call_rate_threshold: float = 0.8
+    open_seconds: float = 30.0
+    half_open_max_calls: int = 1
+
+
+class HedgeConfig(BaseModel):
+    # Send a second attempt once the first has taken longer than this latency percentile
+    percentile: float = 0.95
+    min_delay_seconds: float = 0.05
+    # Latencies to observe before hedging starts
+    min_samples: int = 20
 
 
 class ProviderConfig(BaseModel):
-    type: Literal["dummy", "http_json"] = "dummy"
+    type: Literal["dummy", "http_json", "sse", "webhook", "simulation"] = "dummy"
     dummy: Optional[DummyProviderConfig] = None
+    simulation: Optional[SimulationProviderConfig] = None
     http_json: Optional[HttpJsonProviderConfig] = None
+    sse: Optional[SseProviderConfig] = None
+    webhook: Optional[WebhookProviderConfig] = None
+    # Resilience for polled fetches; breakers are shared per upstream host
+    circuit_breaker: Optional[CircuitBreakerConfig] = None
+    hedge: Optional[HedgeConfig] = None
+    # Isolation: each provider has its own HTTP connection pool, a cap on concurrent
+    # fetches, and a budget covering both queueing for a slot and the call itself
+    max_connections: int = Field(default=10, ge=1)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    timeout_budget_seconds: Optional[float] = Field(default=None, gt=0)
 
 
 # Notifier configs
@@ -77,29 +272,86 @@ class EmailNotifierConfig(BaseModel):
     use_starttls: bool = True
 
 
+class DigestConfig(BaseModel):
+    # Collect alerts from all monitors for up to this long...
+    window_seconds: float = 30.0
+    # ...or until this many are pending, then send one combined message
+    max_items: int = 50
+
+
 class NotifierConfig(BaseModel):
     type: Literal["console", "slack", "email"]
     console: Optional[ConsoleNotifierConfig] = None
     slack: Optional[SlackNotifierConfig] = None
     email: Optional[EmailNotifierConfig] = None
+    digest: Optional[DigestConfig] = None
 
 
 class MonitorConfig(BaseModel):
     name: str
     match_id: str
+    # Name of an entry in `providers`; defaults to the only/"default" provider
+    provider: Optional[str] = None
+    # Glob patterns of sections to watch (needs a provider that reports sections);
+    # rules then see the selected sections reduced by section_aggregate
+    sections: List[str] = Field(default_factory=list)
+    section_aggregate: Literal["sum", "max", "nonempty"] = "sum"
     seat_threshold_min: int = 1
+    # Alert rules, any of which triggers a notification (see rules.parse_rule);
+    # when empty the monitor alerts on `seats >= seat_threshold_min`
+    rules: List[str] = Field(default_factory=list)
     poll_interval_seconds: int = 15
     channels: List[str] = Field(default_factory=list)
     min_notify_interval_seconds: int = 300
 
+    _compiled_rules: List[Rule] = PrivateAttr(default_factory=list)
+
+    @model_validator(mode="after")
+    def compile_rules(self) -> "MonitorConfig":
+        # Compile once at load so syntax errors surface as config errors and the
+        # evaluator never parses text on the hot path
+        self._compiled_rules = [parse_rule(text) for text in self.rules] or [threshold_rule(self.seat_threshold_min)]
+        return self
+
+    @property
+    def compiled_rules(self) -> List[Rule]:
+        return self._compiled_rules
+
+
+DEFAULT_PROVIDER = "default"
+
 
 class Config(BaseModel):
     app: AppConfig
     database: DatabaseConfig
-    provider: ProviderConfig
+    # Single-provider shorthand, registered as providers["default"]
+    provider: Optional[ProviderConfig] = None
+    providers: Dict[str, ProviderConfig] = Field(default_factory=dict)
     notifiers: Dict[str, NotifierConfig]
     monitors: List[MonitorConfig]
 
+    @model_validator(mode="after")
+    def resolve_providers(self) -> "Config":
+        if self.provider is not None:
+            if DEFAULT_PROVIDER in self.providers:
+                raise ValueError(f"'provider' conflicts with providers['{DEFAULT_PROVIDER}']; use one or the other")
+            self.providers[DEFAULT_PROVIDER] = self.provider
+        if not self.providers:
+            raise ValueError("configure 'provider' or at least one entry under 'providers'")
+        for monitor in self.monitors:
+            name = self.provider_name(monitor)
+            if name not in self.providers:
+                raise ValueError(f"monitor '{monitor.name}' refers to unknown provider '{name}'")
+        return self
+
+    def provider_name(self, monitor: MonitorConfig) -> str:
+        """Resolve which named provider a monitor uses."""
+        if monitor.provider:
+            return monitor.provider
+        if len(self.providers) == 1:
+            return next(iter(self.providers))
+        return DEFAULT_PROVIDER
+
 
 def load_config(path: str) -> Config:
     """
@@ -115,4 +367,14 @@ def load_config(path: str) -> Config:
         return Config(**substituted)
     except ValidationError as e:
         # Raise with a concise message so operators see actionable info
-        raise RuntimeError(f"Config validation error: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Config validation error: {e}")
+
+
+def load_scenario(path: str) -> ScenarioConfig:
+    """Load a simulation scenario file (same env substitution as the main config)."""
+    with open(path, "r", encoding="utf-8") as fh:
+        raw = yaml.safe_load(fh) or {}
+    try:
+        return ScenarioConfig(**env_substitute(raw))
+    except ValidationError as e:
+        raise RuntimeError(f"Scenario validation error in {path}: {e}")
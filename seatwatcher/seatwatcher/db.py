@@ -1,40 +1,48 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, sessionmaker
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.orm import Session, sessionmaker
 
 
+_DB_URL: str | None = None
 _ENGINE: Engine | None = None
 _SessionLocal: sessionmaker | None = None
 
 
-def init_engine(db_url: str) -> Engine:
+def init_engine(db_url: str) -> None:
     """
-    Initialize and memoize the SQLAlchemy engine.
+    Register the database URL; the engine itself is created on first use.
 
-    Why: A single process-wide Engine is the recommended pattern. Using a factory
-    avoids accidentally creating many engines (costly in connection pools).
+    Why: A single process-wide Engine is the recommended pattern. Creating it lazily
+    keeps SQLAlchemy out of the import path of commands that never touch the DB
+    (e.g. ``test-notify``), which shortens every cold start.
     """
-    global _ENGINE, _SessionLocal
-    if _ENGINE is None:
-        _ENGINE = create_engine(db_url, pool_pre_ping=True, future=True)
-        _SessionLocal = sessionmaker(bind=_ENGINE, expire_on_commit=False, future=True)
-    return _ENGINE
+    global _DB_URL
+    if _DB_URL is None:
+        _DB_URL = db_url
 
 
 def get_engine() -> Engine:
+    global _ENGINE, _SessionLocal
     if _ENGINE is None:
-        raise RuntimeError("Engine not initialized. Call init_engine(db_url) first.")
+        if _DB_URL is None:
+            raise RuntimeError("Engine not initialized. Call init_engine(db_url) first.")
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        _ENGINE = create_engine(_DB_URL, pool_pre_ping=True, future=True)
+        _SessionLocal = sessionmaker(bind=_ENGINE, expire_on_commit=False, future=True)
     return _ENGINE
 
 
 def get_session_factory() -> sessionmaker:
     if _SessionLocal is None:
-        raise RuntimeError("Session factory not initialized. Call init_engine(db_url) first.")
+        get_engine()
+    assert _SessionLocal is not None
     return _SessionLocal
 
 
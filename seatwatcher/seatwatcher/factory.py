@@ -1,80 +1,316 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, List
+import os
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
 
-from .config import Config, NotifierConfig
+from .config import DEFAULT_PROVIDER, Config, HttpJsonProviderConfig, NotifierConfig, ProviderConfig, WebhookProviderConfig
 from .notifiers.base import CompositeNotifier, Notifier
-from .notifiers.console import ConsoleNotifier
-from .notifiers.emailer import EmailNotifier
-from .notifiers.slack import SlackNotifier
-from .providers.dummy import DummyProvider
-from .providers.http_json import HttpJsonProvider
-
-
-def build_provider(cfg: Config):
-    p = cfg.provider
-    if p.type == "dummy":
-        c = p.dummy
-        if c is None:
-            # Fall back to defaults if absent
-            return DummyProvider(seed=42, min_seats=0, max_seats=10)
-        return DummyProvider(seed=c.seed, min_seats=c.min_seats, max_seats=c.max_seats)
-    if p.type == "http_json":
-        c = p.http_json
-        assert c is not None
-        headers: Dict[str, str] | None = None
-        if c.headers_json:
-            headers = json.loads(c.headers_json)
-        elif c.headers_env:
-            import os
-
-            raw = os.environ.get(c.headers_env)
-            if raw:
-                headers = json.loads(raw)
-        return HttpJsonProvider(
-            url_template=c.url_template,
-            method=c.method,
-            timeout_seconds=c.timeout_seconds,
-            jmespath_expr=c.jmespath,
-            headers=headers,
-            body_template=c.body_template,
+from .providers.base import SeatProvider
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .providers.http_json import HttpJsonProvider
+    from .providers.resilience import CircuitBreaker
+
+
+# Builders import their implementation modules on first use. Why: the heavy client
+# libraries (httpx, jmespath, aiosmtplib) are only needed for the types actually
+# configured, and every CLI invocation / container restart pays for what it imports.
+ProviderBuilder = Callable[[str, ProviderConfig, Optional[Dict[str, "CircuitBreaker"]]], SeatProvider]
+NotifierBuilder = Callable[[NotifierConfig], Notifier]
+
+
+def _load_headers(headers_json: Optional[str], headers_env: Optional[str]) -> Dict[str, str] | None:
+    if headers_json:
+        return json.loads(headers_json)
+    if headers_env:
+        raw = os.environ.get(headers_env)
+        if raw:
+            return json.loads(raw)
+    return None
+
+
+def _build_http_json(c: HttpJsonProviderConfig, max_connections: int = 10) -> HttpJsonProvider:
+    from .providers.http_json import HttpJsonProvider
+
+    return HttpJsonProvider(
+        url_template=c.url_template,
+        method=c.method,
+        timeout_seconds=c.timeout_seconds,
+        jmespath_expr=c.jmespath,
+        headers=_load_headers(c.headers_json, c.headers_env),
+        body_template=c.body_template,
+        max_connections=max_connections,
+        sections_jmespath=c.sections_jmespath,
+    )
+
+
+def _host_of(url_template: str) -> str:
+    return urlsplit(url_template).netloc or url_template
+
+
+def _with_resilience(
+    provider: SeatProvider,
+    p: ProviderConfig,
+    breaker_key: str,
+    breakers: Optional[Dict[str, CircuitBreaker]],
+) -> SeatProvider:
+    """
+    Wrap a polled provider with its concurrency cap, circuit breaker and hedging.
+
+    Breakers live in ``breakers`` keyed by ``breaker_key``: the upstream host for HTTP
+    providers, so every provider talking to the same upstream trips (and recovers)
+    together, and the provider name for in-process ones, which share nothing. The breaker sits outside the cap so an
+    open circuit rejects immediately instead of queueing for a slot first.
+    """
+    if p.max_concurrency is not None or p.timeout_budget_seconds is not None:
+        from .providers.bounded import BoundedProvider
+
+        provider = BoundedProvider(
+            provider,
+            max_concurrency=p.max_concurrency,
+            timeout_budget_seconds=p.timeout_budget_seconds,
         )
-    raise ValueError(f"Unknown provider type: {p.type}")
+    if p.circuit_breaker is None and p.hedge is None:
+        return provider
+    from .providers.resilience import CircuitBreaker, ResilientProvider
+
+    breaker: Optional[CircuitBreaker] = None
+    if p.circuit_breaker is not None:
+        registry = breakers if breakers is not None else {}
+        if breaker_key not in registry:
+            cb = p.circuit_breaker
+            registry[breaker_key] = CircuitBreaker(
+                name=breaker_key,
+                window_size=cb.window_size,
+                min_calls=cb.min_calls,
+                error_rate_threshold=cb.error_rate_threshold,
+                slow_call_seconds=cb.slow_call_seconds,
+                slow_call_rate_threshold=cb.slow_call_rate_threshold,
+                open_seconds=cb.open_seconds,
+                half_open_max_calls=cb.half_open_max_calls,
+            )
+        breaker = registry[breaker_key]
+    if p.hedge is None:
+        return ResilientProvider(provider, breaker=breaker)
+    return ResilientProvider(
+        provider,
+        breaker=breaker,
+        hedge=True,
+        hedge_percentile=p.hedge.percentile,
+        hedge_min_delay_seconds=p.hedge.min_delay_seconds,
+        hedge_min_samples=p.hedge.min_samples,
+    )
+
+
+def _dummy_provider(
+    name: str, p: ProviderConfig, breakers: Optional[Dict[str, CircuitBreaker]]
+) -> SeatProvider:
+    from .providers.dummy import DummyProvider
+
+    c = p.dummy
+    if c is None:
+        # Fall back to defaults if absent
+        provider = DummyProvider(seed=42, min_seats=0, max_seats=10)
+    else:
+        provider = DummyProvider(seed=c.seed, min_seats=c.min_seats, max_seats=c.max_seats)
+    return _with_resilience(provider, p, name, breakers)
+
+
+def _simulation_provider(
+    name: str, p: ProviderConfig, breakers: Optional[Dict[str, CircuitBreaker]]
+) -> SeatProvider:
+    from .config import ScenarioConfig, load_scenario
+    from .providers.simulation import SimulationProvider
+
+    c = p.simulation
+    if c is not None and c.scenario_file:
+        scenario = load_scenario(c.scenario_file)
+    elif c is not None and c.scenario is not None:
+        scenario = c.scenario
+    else:
+        scenario = ScenarioConfig()
+    provider = SimulationProvider(scenario, seed=c.seed if c is not None else None)
+    return _with_resilience(provider, p, name, breakers)
+
+
+def _http_json_provider(
+    name: str, p: ProviderConfig, breakers: Optional[Dict[str, CircuitBreaker]]
+) -> SeatProvider:
+    assert p.http_json is not None
+    return _with_resilience(_build_http_json(p.http_json, p.max_connections), p, _host_of(p.http_json.url_template), breakers)
+
+
+def _sse_provider(
+    name: str, p: ProviderConfig, breakers: Optional[Dict[str, CircuitBreaker]]
+) -> SeatProvider:
+    from .providers.sse import SseProvider
+
+    c = p.sse
+    assert c is not None
+    return SseProvider(
+        url_template=c.url_template,
+        match_id_jmespath=c.match_id_jmespath,
+        seats_jmespath=c.seats_jmespath,
+        headers=_load_headers(c.headers_json, c.headers_env),
+        read_timeout_seconds=c.read_timeout_seconds,
+        reconnect_initial_seconds=c.reconnect_initial_seconds,
+        reconnect_max_seconds=c.reconnect_max_seconds,
+        fallback=(
+            _with_resilience(_build_http_json(c.fallback, p.max_connections), p, _host_of(c.fallback.url_template), breakers)
+            if c.fallback
+            else None
+        ),
+        fallback_after_seconds=c.fallback_after_seconds,
+        fallback_interval_seconds=c.fallback_interval_seconds,
+        max_url_length=c.max_url_length,
+    )
+
+
+def _webhook_provider(
+    name: str, p: ProviderConfig, breakers: Optional[Dict[str, CircuitBreaker]]
+) -> SeatProvider:
+    from .providers.webhook import WebhookProvider
 
+    # Every webhook setting has a default, so the section may be omitted
+    c = p.webhook or WebhookProviderConfig()
+    return WebhookProvider(
+        host=c.host,
+        port=c.port,
+        path=c.path,
+        hmac_secret_env=c.hmac_secret_env,
+        hmac_secret_file_env=c.hmac_secret_file_env,
+        signature_header=c.signature_header,
+        max_queue_batches=c.max_queue_batches,
+        max_batch_updates=c.max_batch_updates,
+        max_body_bytes=c.max_body_bytes,
+    )
 
-def build_notifier(cfg: Config, monitor_channels: List[str]) -> CompositeNotifier:
+
+_PROVIDER_BUILDERS: Dict[str, ProviderBuilder] = {
+    "dummy": _dummy_provider,
+    "http_json": _http_json_provider,
+    "sse": _sse_provider,
+    "webhook": _webhook_provider,
+    "simulation": _simulation_provider,
+}
+
+
+def _build_named_provider(
+    name: str, p: ProviderConfig, breakers: Optional[Dict[str, CircuitBreaker]]
+) -> SeatProvider:
+    builder = _PROVIDER_BUILDERS.get(p.type)
+    if builder is None:
+        raise ValueError(f"Unknown provider type: {p.type}")
+    return builder(name, p, breakers)
+
+
+def build_providers(
+    cfg: Config,
+    breakers: Optional[Dict[str, CircuitBreaker]] = None,
+) -> Dict[str, SeatProvider]:
+    """
+    Build every named provider that at least one monitor uses.
+
+    Each gets its own connection pool and concurrency cap; only circuit breakers are
+    shared, and only between HTTP providers that hit the same host.
+    """
+    used = {cfg.provider_name(monitor) for monitor in cfg.monitors}
+    return {name: _build_named_provider(name, p, breakers) for name, p in cfg.providers.items() if name in used}
+
+
+def build_provider(cfg: Config, breakers: Optional[Dict[str, CircuitBreaker]] = None) -> SeatProvider:
+    """Build the default provider (the only one, or the one named ``default``)."""
+    if len(cfg.providers) == 1:
+        name, p = next(iter(cfg.providers.items()))
+        return _build_named_provider(name, p, breakers)
+    p = cfg.providers.get(DEFAULT_PROVIDER)
+    if p is None:
+        raise ValueError(f"No '{DEFAULT_PROVIDER}' provider configured")
+    return _build_named_provider(DEFAULT_PROVIDER, p, breakers)
+
+
+def _console_notifier(nconf: NotifierConfig) -> Notifier:
+    from .notifiers.console import ConsoleNotifier
+
+    return ConsoleNotifier()
+
+
+def _slack_notifier(nconf: NotifierConfig) -> Notifier:
+    from .notifiers.slack import SlackNotifier
+
+    assert nconf.slack is not None
+    return SlackNotifier(
+        webhook_url_env=nconf.slack.webhook_url_env,
+        webhook_url_file_env=nconf.slack.webhook_url_file_env,
+    )
+
+
+def _email_notifier(nconf: NotifierConfig) -> Notifier:
+    from .notifiers.emailer import EmailNotifier
+
+    assert nconf.email is not None
+    e = nconf.email
+    return EmailNotifier(
+        from_email=e.from_email,
+        to_emails=e.to_emails,
+        smtp_host=e.smtp_host,
+        smtp_port=e.smtp_port,
+        username_env=e.username_env,
+        password_env=e.password_env,
+        password_file_env=e.password_file_env,
+        use_tls=e.use_tls,
+        use_starttls=e.use_starttls,
+    )
+
+
+_NOTIFIER_BUILDERS: Dict[str, NotifierBuilder] = {
+    "console": _console_notifier,
+    "slack": _slack_notifier,
+    "email": _email_notifier,
+}
+
+
+def _build_single_notifier(nconf: NotifierConfig, digests: bool = True) -> Notifier:
+    builder = _NOTIFIER_BUILDERS.get(nconf.type)
+    if builder is None:
+        raise RuntimeError(f"Unsupported notifier type: {nconf.type}")
+    notifier = builder(nconf)
+    if digests and nconf.digest is not None:
+        from .notifiers.digest import DigestNotifier
+
+        notifier = DigestNotifier(
+            notifier,
+            window_seconds=nconf.digest.window_seconds,
+            max_items=nconf.digest.max_items,
+        )
+    return notifier
+
+
+def build_notifier(
+    cfg: Config,
+    monitor_channels: List[str],
+    shared: Optional[Dict[str, Notifier]] = None,
+    digests: bool = True,
+) -> CompositeNotifier:
+    """
+    Build the fan-out notifier for a monitor's channels.
+
+    Pass the same ``shared`` dict for every monitor so each configured notifier is
+    instantiated once per process; digests rely on this to combine alerts across
+    monitors. ``digests=False`` sends straight through, ignoring any ``digest``
+    settings (for one-off messages that should not wait out a window).
+    """
     notifiers: List[Notifier] = []
     for name in monitor_channels:
         nconf: NotifierConfig | None = cfg.notifiers.get(name)
         if not nconf:
             raise RuntimeError(f"Notifier '{name}' not found in config")
-        if nconf.type == "console":
-            notifiers.append(ConsoleNotifier())
-        elif nconf.type == "slack":
-            assert nconf.slack is not None
-            notifiers.append(
-                SlackNotifier(
-                    webhook_url_env=nconf.slack.webhook_url_env,
-                    webhook_url_file_env=nconf.slack.webhook_url_file_env,
-                )
-            )
-        elif nconf.type == "email":
-            assert nconf.email is not None
-            e = nconf.email
-            notifiers.append(
-                EmailNotifier(
-                    from_email=e.from_email,
-                    to_emails=e.to_emails,
-                    smtp_host=e.smtp_host,
-                    smtp_port=e.smtp_port,
-                    username_env=e.username_env,
-                    password_env=e.password_env,
-                    password_file_env=e.password_file_env,
-                    use_tls=e.use_tls,
-                    use_starttls=e.use_starttls,
-                )
-            )
-        else:
-            raise RuntimeError(f"Unsupported notifier type: {nconf.type}")
-    return CompositeNotifier(notifiers)
\ No newline at end of file
+        if shared is None:
+            notifiers.append(_build_single_notifier(nconf, digests))
+            continue
+        if name not in shared:
+            shared[name] = _build_single_notifier(nconf, digests)
+        notifiers.append(shared[name])
+    return CompositeNotifier(notifiers)
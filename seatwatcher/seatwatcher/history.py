@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ObservationHistory:
+    """
+    Fixed-size ring buffers of recent ``(timestamp, seats)`` samples per match.
+
+    All matches share three flat arrays (``capacity`` slots per match) instead of one
+    object per sample or per match, so memory is ``~12 * capacity`` bytes per match
+    plus one dict entry: about 77 MB for 100k matches at the default capacity of 64.
+    Appends are O(1); window queries scan at most ``capacity`` samples.
+
+    Why: Trend checks (rate of change, time above threshold) and live debugging need
+    recent history, and querying the ``observations`` table on every tick would put
+    the database on the hot path.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._capacity = capacity
+        self._slots: Dict[str, int] = {}
+        self._times = array("d")
+        self._seats = array("i")
+        # Per match: index of the next write within its slot, and samples held
+        self._head = array("l")
+        self._count = array("l")
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, match_id: object) -> bool:
+        return match_id in self._slots
+
+    def append(self, match_id: str, seats: int, ts: Optional[float] = None) -> None:
+        slot = self._slots.get(match_id)
+        if slot is None:
+            slot = self._slots[match_id] = len(self._head)
+            self._times.frombytes(bytes(self._capacity * self._times.itemsize))
+            self._seats.frombytes(bytes(self._capacity * self._seats.itemsize))
+            self._head.append(0)
+            self._count.append(0)
+        head = self._head[slot]
+        base = slot * self._capacity
+        self._times[base + head] = time.time() if ts is None else ts
+        self._seats[base + head] = seats
+        self._head[slot] = (head + 1) % self._capacity
+        if self._count[slot] < self._capacity:
+            self._count[slot] += 1
+
+    def samples(self, match_id: str, window_seconds: Optional[float] = None, now: Optional[float] = None) -> List[Tuple[float, int]]:
+        """Samples oldest-first, optionally only those within the last ``window_seconds``."""
+        slot = self._slots.get(match_id)
+        if slot is None:
+            return []
+        count = self._count[slot]
+        base = slot * self._capacity
+        start = (self._head[slot] - count) % self._capacity
+        out: List[Tuple[float, int]] = []
+        for i in range(count):
+            j = base + (start + i) % self._capacity
+            out.append((self._times[j], self._seats[j]))
+        if window_seconds is not None:
+            cutoff = (time.time() if now is None else now) - window_seconds
+            out = [s for s in out if s[0] >= cutoff]
+        return out
+
+    def latest(self, match_id: str) -> Optional[Tuple[float, int]]:
+        slot = self._slots.get(match_id)
+        if slot is None or self._count[slot] == 0:
+            return None
+        j = slot * self._capacity + (self._head[slot] - 1) % self._capacity
+        return self._times[j], self._seats[j]
+
+    def rate_of_change(self, match_id: str, window_seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """Seats per second between the oldest and newest sample in the window."""
+        window = self.samples(match_id, window_seconds, now)
+        if len(window) < 2 or window[-1][0] <= window[0][0]:
+            return None
+        return (window[-1][1] - window[0][1]) / (window[-1][0] - window[0][0])
+
+    def min_max(self, match_id: str, window_seconds: Optional[float] = None, now: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        window = self.samples(match_id, window_seconds, now)
+        if not window:
+            return None
+        seats = [s for _, s in window]
+        return min(seats), max(seats)
+
+    def time_above(self, match_id: str, threshold: int, window_seconds: float, now: Optional[float] = None) -> float:
+        """
+        Seconds within the window during which availability was >= ``threshold``.
+
+        Each sample's value is assumed to hold until the next sample (or ``now``).
+        """
+        now = time.time() if now is None else now
+        cutoff = now - window_seconds
+        window = self.samples(match_id)
+        total = 0.0
+        for i, (ts, seats) in enumerate(window):
+            end = window[i + 1][0] if i + 1 < len(window) else now
+            start = max(ts, cutoff)
+            if seats >= threshold and end > start:
+                total += end - start
+        return total
+
+    def summary(
+        self,
+        match_id: str,
+        window_seconds: float = 300.0,
+        threshold: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        latest = self.latest(match_id)
+        bounds = self.min_max(match_id, window_seconds, now)
+        doc: Dict[str, Any] = {
+            "match_id": match_id,
+            "samples": len(self.samples(match_id)),
+            "latest": {"ts": latest[0], "seats": latest[1]} if latest else None,
+            "window_seconds": window_seconds,
+            "min": bounds[0] if bounds else None,
+            "max": bounds[1] if bounds else None,
+            "rate_per_second": self.rate_of_change(match_id, window_seconds, now),
+        }
+        if threshold is not None:
+            doc["threshold"] = threshold
+            doc["seconds_above_threshold"] = self.time_above(match_id, threshold, window_seconds, now)
+        return doc
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the sample arrays (excludes the match-id index)."""
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self._times, self._seats, self._head, self._count))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"matches": len(self), "capacity": self._capacity, "array_bytes": self.memory_bytes()}
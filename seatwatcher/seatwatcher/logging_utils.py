@@ -1,30 +1,176 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Optional
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional
 
 
-def configure_logging(level: str = "INFO") -> None:
+_TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue: Optional["queue.SimpleQueue[logging.LogRecord]"] = None
+_limit_filters: Dict[str, "RateLimitFilter"] = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One compact JSON object per line.
+
+    Fields passed with ``extra=`` (e.g. ``monitor``, ``match_id``) become top-level
+    keys, so aggregators can filter by monitor without parsing message text.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        doc: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                doc[key] = value
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, default=str, separators=(",", ":"))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket rate limit and/or random sampling for one logger's chatty records.
+
+    Only records at or below ``max_level`` are limited, so warnings and errors are
+    never dropped. Dropped records are counted and reported via ``log_stats``.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+        max_level: str = "DEBUG",
+    ) -> None:
+        super().__init__()
+        self._rate = rate_per_second
+        self._capacity = float(burst if burst is not None else max(1.0, rate_per_second or 1.0))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._sample_rate = sample_rate
+        self._max_level = logging.getLevelName(max_level.upper())
+        # Records come from the event loop and from executor threads (DB work)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self._max_level:
+            return True
+        if self._sample_rate is not None and random.random() >= self._sample_rate:
+            with self._lock:
+                self.dropped += 1
+            return False
+        if self._rate is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.dropped += 1
+            return False
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler formats the record on the calling thread. Only merge the
+    # arguments here (they may be mutated after the call returns) and leave
+    # timestamps, JSON encoding and the write to the listener thread.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "text",
+    use_queue: bool = False,
+    limits: Optional[Mapping[str, Mapping[str, Any]]] = None,
+) -> None:
     """
     Configure application-wide logging.
 
     Why: Centralizing logging configuration ensures consistent formatting and
     makes it trivial to adjust verbosity. Using stdout aligns with cloud-native
     logging best practices (aggregators scrape stdout/stderr).
+
+    With ``use_queue`` the caller only enqueues the record; a background thread
+    formats and writes it, so a slow stdout (or DEBUG with thousands of monitors)
+    never blocks the event loop. ``limits`` maps logger names to
+    ``RateLimitFilter`` arguments.
     """
+    global _listener, _queue
     root = logging.getLogger()
     root.setLevel(getattr(logging, level.upper(), logging.INFO))
 
     handler = logging.StreamHandler(stream=sys.stdout)
-    formatter = logging.Formatter(
-        fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-        datefmt="%Y-%m-%dT%H:%M:%S%z",
-    )
-    handler.setFormatter(formatter)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(fmt=_TEXT_FORMAT, datefmt=_DATE_FORMAT))
 
     # Remove existing handlers to avoid duplicate logs when re-configured
+    _stop_listener()
     root.handlers.clear()
-    root.addHandler(handler)
+    if use_queue:
+        _queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_DeferredQueueHandler(_queue))
+    else:
+        root.addHandler(handler)
+
+    for name, limit_filter in _limit_filters.items():
+        logging.getLogger(name).removeFilter(limit_filter)
+    _limit_filters.clear()
+    for name, options in (limits or {}).items():
+        limit_filter = RateLimitFilter(**options)
+        logging.getLogger(name).addFilter(limit_filter)
+        _limit_filters[name] = limit_filter
+
+
+def _stop_listener() -> None:
+    global _listener, _queue
+    if _listener is not None:
+        # Drains records still queued before returning
+        _listener.stop()
+        _listener = None
+        _queue = None
+
+
+atexit.register(_stop_listener)
+
+
+def log_stats() -> Dict[str, Any]:
+    return {
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "dropped": {name: f.dropped for name, f in _limit_filters.items()},
+    }
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
-    return logging.getLogger(name or __name__)
\ No newline at end of file
+    return logging.getLogger(name or __name__)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+from .logging_utils import get_logger
+from .utils.httpserver import Request, Response, start_http_server
+
+
+logger = get_logger(__name__)
+
+
+MetricsSource = Callable[[], Any]
+# Receives the request's query parameters; raise LookupError for 404, ValueError for 400
+DebugHandler = Callable[[Dict[str, str]], Any]
+
+
+class MetricsRegistry:
+    """
+    Named callables whose results form the ``/metrics`` JSON document.
+
+    Why: Sources are pulled when scraped, so components only keep the counters they
+    already need and nothing is computed when nobody is looking.
+    """
+
+    def __init__(self) -> None:
+        self._sources: Dict[str, MetricsSource] = {}
+        self._debug: Dict[str, DebugHandler] = {}
+        self._started = time.time()
+
+    def register(self, name: str, source: MetricsSource) -> None:
+        self._sources[name] = source
+
+    def register_debug(self, name: str, handler: DebugHandler) -> None:
+        """Expose ``handler`` at ``/debug/<name>`` for live inspection."""
+        self._debug[name] = handler
+
+    def debug(self, name: str, query: Dict[str, str]) -> Any:
+        handler = self._debug.get(name)
+        if handler is None:
+            raise LookupError(f"unknown debug endpoint: {name}")
+        return handler(query)
+
+    def snapshot(self) -> Dict[str, Any]:
+        doc: Dict[str, Any] = {"uptime_seconds": round(time.time() - self._started, 3)}
+        for name, source in self._sources.items():
+            try:
+                doc[name] = source()
+            except Exception as exc:  # noqa: BLE001
+                doc[name] = {"error": str(exc)}
+        return doc
+
+
+async def start_metrics_server(registry: MetricsRegistry, host: str, port: int) -> asyncio.AbstractServer:
+    async def _handle(request: Request) -> Response:
+        if request.method != "GET":
+            return Response.json(405, {"error": "method not allowed"})
+        if request.path == "/metrics":
+            return Response.json(200, registry.snapshot())
+        if request.path == "/healthz":
+            return Response.json(200, {"status": "ok"})
+        if request.path.startswith("/debug/"):
+            try:
+                return Response.json(200, registry.debug(request.path[len("/debug/"):], request.query))
+            except LookupError as exc:
+                return Response.json(404, {"error": str(exc)})
+            except ValueError as exc:
+                return Response.json(400, {"error": str(exc)})
+        return Response.json(404, {"error": "not found"})
+
+    server = await start_http_server(_handle, host=host, port=port)
+    logger.info("Metrics endpoint listening on %s:%s/metrics", host, port)
+    return server
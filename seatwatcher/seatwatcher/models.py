@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -19,6 +19,9 @@ class Observation(Base):
 
     match_id: Mapped[str] = mapped_column(String(256), index=True, nullable=False)
     seats_available: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Per-section snapshot (utils.sections.encode_sections) when the provider reports
+    # sections; seats_available is then the venue total
+    sections_blob: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
 
 
 class NotificationLog(Base):
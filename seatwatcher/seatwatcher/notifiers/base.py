@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import asyncio
 from typing import Protocol
 
 
@@ -29,8 +30,16 @@ class CompositeNotifier:
         self._notifiers = notifiers
 
     async def send_all(self, subject: str, message: str | None = None) -> None:
-        for notifier in self._notifiers:
-            await notifier.send(subject=subject, message=message)
+        # Concurrently: a digest channel returns only once its digest goes out, which
+        # must not hold up the other channels
+        await asyncio.gather(*(notifier.send(subject=subject, message=message) for notifier in self._notifiers))
 
     def channels(self) -> list[str]:
-        return [n.channel_name() for n in self._notifiers]
\ No newline at end of file
+        return [n.channel_name() for n in self._notifiers]
+
+    async def aclose(self) -> None:
+        # Only buffering notifiers (e.g. digests) need to flush on shutdown
+        for notifier in self._notifiers:
+            close = getattr(notifier, "aclose", None)
+            if close is not None:
+                await close()
\ No newline at end of file
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from ..logging_utils import get_logger
+from .base import Notifier
+
+
+logger = get_logger(__name__)
+
+
+class DigestNotifier(Notifier):
+    """
+    Buffer alerts for a channel and deliver them as one combined message.
+
+    A digest goes out ``window_seconds`` after its first alert or as soon as it holds
+    ``max_items``, whichever comes first. ``send`` returns once the digest holding
+    the alert has been delivered, and raises if that delivery failed, so callers
+    record an alert only after it really went out.
+
+    Why: During a big release many monitors cross threshold within seconds. Sharing
+    one instance per channel across monitors turns that burst into a single Slack
+    post or email instead of dozens, keeping us well inside provider rate limits.
+    """
+
+    def __init__(self, inner: Notifier, window_seconds: float, max_items: int) -> None:
+        self._inner = inner
+        self._window_seconds = window_seconds
+        self._max_items = max(1, max_items)
+        self._pending: List[Tuple[str, Optional[str], asyncio.Future[None]]] = []
+        self._timer: Optional[asyncio.Task[None]] = None
+        # Keep references to in-flight deliveries so they are not garbage collected
+        self._deliveries: Set[asyncio.Task[None]] = set()
+
+    def channel_name(self) -> str:
+        return self._inner.channel_name()
+
+    async def send(self, subject: str, message: str | None = None) -> None:
+        delivered: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pending.append((subject, message, delivered))
+        if len(self._pending) >= self._max_items:
+            # Deliver in the background: the monitor that happens to fill the buffer
+            # should not own (or be cancelled with) everyone else's alerts
+            task = asyncio.create_task(self._deliver_logged(self._take()))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        await delivered
+
+    async def flush(self) -> None:
+        items = self._take()
+        if items:
+            await self._deliver(items)
+
+    async def aclose(self) -> None:
+        """Deliver anything still buffered or in flight; call on shutdown."""
+        await self.flush()
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+    def _take(self) -> List[Tuple[str, Optional[str], asyncio.Future[None]]]:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        items, self._pending = self._pending, []
+        return items
+
+    async def _deliver(self, items: List[Tuple[str, Optional[str], asyncio.Future[None]]]) -> None:
+        # Senders that gave up waiting (e.g. cancelled on shutdown) are still delivered
+        if len(items) == 1:
+            subject, message, _ = items[0]
+        else:
+            subject = f"{len(items)} seat alerts"
+            message = "\n\n".join(s if not m else f"{s}\n{m}" for s, m, _ in items)
+        try:
+            await self._inner.send(subject=subject, message=message)
+        except Exception as exc:
+            # Each waiting sender sees the failure, so its alert is not recorded as sent
+            for _, _, delivered in items:
+                if not delivered.done():
+                    delivered.set_exception(exc)
+            raise
+        for _, _, delivered in items:
+            if not delivered.done():
+                delivered.set_result(None)
+
+    async def _deliver_logged(self, items: List[Tuple[str, Optional[str], asyncio.Future[None]]]) -> None:
+        if not items:
+            return
+        try:
+            await self._deliver(items)
+        except Exception as exc:  # noqa: BLE001
+            # Senders get the error too; log once here for the channel as a whole
+            logger.warning("Digest of %d alerts on %s failed: %s", len(items), self.channel_name(), exc)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._window_seconds)
+        await self._deliver_logged(self._take())
@@ -1,7 +1,22 @@
 from __future__ import annotations
 
 import abc
-from typing import Protocol
+from typing import AsyncIterator, Dict, NamedTuple, Protocol, Tuple, runtime_checkable
+
+
+# A single pushed availability change: (match_id, seats_available)
+SeatUpdate = Tuple[str, int]
+
+# Largest seat count we accept from an upstream: observations.seats_available is a
+# 32-bit Integer column
+MAX_SEATS = 2**31 - 1
+
+
+def check_seats(seats: int) -> int:
+    """Return ``seats`` if it is a storable seat count, else raise ``ValueError``."""
+    if not 0 <= seats <= MAX_SEATS:
+        raise ValueError(f"seats must be between 0 and {MAX_SEATS}: {seats!r}")
+    return seats
 
 
 class SeatProvider(Protocol):
@@ -9,7 +24,48 @@ class SeatProvider(Protocol):
         ...
 
 
+@runtime_checkable
+class StreamingSeatProvider(SeatProvider, Protocol):
+    """
+    Provider that pushes updates instead of being polled.
+
+    Why: Upstreams that expose a change feed let us react within the same second at a
+    fraction of the request volume. Updates are yielded in batches so consumers can
+    amortize per-update work (e.g. one DB transaction per batch).
+    """
+
+    def stream(self, match_ids: list[str]) -> AsyncIterator[list[SeatUpdate]]:  # pragma: no cover - protocol
+        ...
+
+
+class SectionSnapshot(NamedTuple):
+    # Whole-venue availability as the upstream reports it; sections need not add up
+    # to it (unlisted or held-back sections)
+    total: int
+    sections: Dict[str, int]
+
+
+class SectionSeatProvider(SeatProvider, Protocol):
+    """
+    Provider that can break availability down by section (stand, block, price band).
+
+    Implementations set ``sections_supported``; wrappers forward it from the provider
+    they wrap, since whether sections are available can depend on configuration.
+    ``fetch_sections`` returns the venue total and the breakdown from one upstream
+    response, so the two always describe the same moment.
+    """
+
+    sections_supported: bool
+
+    async def fetch_sections(self, match_id: str) -> SectionSnapshot:  # pragma: no cover - protocol
+        ...
+
+
+def provides_sections(provider: SeatProvider) -> bool:
+    return bool(getattr(provider, "sections_supported", False))
+
+
 class ProviderFactory(abc.ABC):
     @abc.abstractmethod
     def create(self) -> SeatProvider:  # pragma: no cover - abstract factory
-        ...
\ No newline at end of file
+        ...
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Coroutine, Dict, Optional, TypeVar
+
+from .base import SeatProvider, SectionSnapshot, provides_sections
+
+
+T = TypeVar("T")
+
+
+class ProviderTimeoutError(RuntimeError):
+    """
+    Raised when a fetch (including the wait for a free slot) exceeds its budget.
+
+    ``queued`` is true when the budget ran out before the fetch got a slot, i.e. the
+    upstream was never called.
+    """
+
+    def __init__(self, message: str, queued: bool = False) -> None:
+        super().__init__(message)
+        self.queued = queued
+
+
+class BoundedProvider(SeatProvider):
+    """
+    Cap a provider's concurrent fetches and bound each fetch's total time.
+
+    ``timeout_budget_seconds`` covers queueing for a slot as well as the call itself,
+    so a monitor never waits longer than its budget no matter how backed up the
+    provider is.
+
+    Why: Each named provider gets its own cap, so a slow vendor can only tie up its
+    own slots and never starves monitors that use other vendors.
+    """
+
+    def __init__(
+        self,
+        inner: SeatProvider,
+        max_concurrency: Optional[int] = None,
+        timeout_budget_seconds: Optional[float] = None,
+    ) -> None:
+        self._inner = inner
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._max_concurrency = max_concurrency
+        self._timeout_budget_seconds = timeout_budget_seconds
+        self._in_flight = 0
+        self._waiting = 0
+        self._timeouts = 0
+
+    @property
+    def sections_supported(self) -> bool:
+        return provides_sections(self._inner)
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        return await self._bounded(self._inner.fetch_available_seats, match_id)
+
+    async def fetch_sections(self, match_id: str) -> SectionSnapshot:
+        return await self._bounded(self._inner.fetch_sections, match_id)  # type: ignore[attr-defined]
+
+    async def _bounded(self, fetch: Callable[[str], Coroutine[Any, Any, T]], match_id: str) -> T:
+        if self._timeout_budget_seconds is None:
+            return await self._fetch(fetch, match_id)
+        # Not wait_for: it reports an expired budget as TimeoutError, the same type
+        # (since 3.11) an inner provider raises for its own timeouts, and the two
+        # must not be confused
+        started = asyncio.Event()
+        task = asyncio.ensure_future(self._fetch(fetch, match_id, started))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self._timeout_budget_seconds)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if not done:
+            task.cancel()
+            # Let the fetch release its slot before reporting
+            await asyncio.gather(task, return_exceptions=True)
+            self._timeouts += 1
+            if not started.is_set():
+                raise ProviderTimeoutError(
+                    f"Fetch for {match_id} spent its {self._timeout_budget_seconds}s budget waiting for a slot", queued=True
+                )
+            raise ProviderTimeoutError(f"Fetch for {match_id} exceeded {self._timeout_budget_seconds}s budget")
+        return task.result()
+
+    async def aclose(self) -> None:
+        close = getattr(self._inner, "aclose", None)
+        if close is not None:
+            await close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "max_concurrency": self._max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "budget_timeouts": self._timeouts,
+        }
+        inner_stats = getattr(self._inner, "stats", None)
+        if inner_stats is not None:
+            stats.update(inner_stats())
+        return stats
+
+    async def _fetch(
+        self,
+        fetch: Callable[[str], Coroutine[Any, Any, T]],
+        match_id: str,
+        started: Optional[asyncio.Event] = None,
+    ) -> T:
+        if self._semaphore is None:
+            return await self._call(fetch, match_id, started)
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            return await self._call(fetch, match_id, started)
+        finally:
+            self._semaphore.release()
+
+    async def _call(
+        self,
+        fetch: Callable[[str], Coroutine[Any, Any, T]],
+        match_id: str,
+        started: Optional[asyncio.Event] = None,
+    ) -> T:
+        if started is not None:
+            started.set()
+        self._in_flight += 1
+        try:
+            return await fetch(match_id)
+        finally:
+            self._in_flight -= 1
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from string import Template
 from typing import Any, Dict, Optional
 
@@ -9,7 +9,7 @@ import httpx
 import jmespath
 
 from ..logging_utils import get_logger
-from .base import SeatProvider
+from .base import SeatProvider, SectionSnapshot
 
 
 logger = get_logger(__name__)
@@ -23,30 +23,80 @@ class HttpJsonProvider(SeatProvider):
     jmespath_expr: str
     headers: Optional[Dict[str, str]] = None
     body_template: Optional[str] = None
+    # Size of this provider's own connection pool
+    max_connections: int = 10
+    # JMESPath yielding {section: seats} or [[section, seats], ...]; enables sections
+    sections_jmespath: Optional[str] = None
 
-    async def fetch_available_seats(self, match_id: str) -> int:
+    _client: Optional[httpx.AsyncClient] = field(default=None, init=False, repr=False)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # One long-lived client per provider: connections are reused across ticks and
+        # a slow upstream can only exhaust its own pool, never another provider's
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def sections_supported(self) -> bool:
+        return self.sections_jmespath is not None
+
+    async def _fetch_json(self, match_id: str) -> Any:
         url = Template(self.url_template).safe_substitute({"match_id": match_id})
         body: Optional[str] = None
         if self.body_template:
             body = Template(self.body_template).safe_substitute({"match_id": match_id})
 
-        timeout = httpx.Timeout(self.timeout_seconds)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            if self.method.upper() == "POST":
-                response = await client.post(url, headers=self.headers, content=body)
-            else:
-                response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
+        client = self._get_client()
+        if self.method.upper() == "POST":
+            response = await client.post(url, headers=self.headers, content=body)
+        else:
+            response = await client.get(url, headers=self.headers)
+        response.raise_for_status()
+        return response.json()
 
+    @staticmethod
+    def _search(expr: str, data: Any) -> Any:
         # Use JMESPath to extract a value robustly even if API response changes order/structure
         try:
-            value = jmespath.search(self.jmespath_expr, data)
+            value = jmespath.search(expr, data)
         except Exception as exc:  # noqa: BLE001
             raise RuntimeError(f"JMESPath extraction failed: {exc}")
         if value is None:
             raise RuntimeError("JMESPath expression returned None")
+        return value
+
+    def _seats(self, data: Any) -> int:
+        value = self._search(self.jmespath_expr, data)
         try:
             return int(value)
         except Exception as exc:  # noqa: BLE001
-            raise RuntimeError(f"Seat value is not an integer: {value!r}: {exc}")
\ No newline at end of file
+            raise RuntimeError(f"Seat value is not an integer: {value!r}: {exc}")
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        return self._seats(await self._fetch_json(match_id))
+
+    async def fetch_sections(self, match_id: str) -> SectionSnapshot:
+        if self.sections_jmespath is None:
+            raise RuntimeError("sections_jmespath is not configured")
+        # Total and breakdown come from the same response; the total is the
+        # upstream's own figure, not the sum of the sections it chose to list
+        data = await self._fetch_json(match_id)
+        value = self._search(self.sections_jmespath, data)
+        items = value.items() if isinstance(value, dict) else value
+        try:
+            sections = {str(name): int(seats) for name, seats in items}
+        except Exception as exc:  # noqa: BLE001
+            raise RuntimeError(f"Sections value is not a mapping of section to seats: {value!r}: {exc}")
+        return SectionSnapshot(self._seats(data), sections)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, Dict, Optional, Tuple, TypeVar
+
+from ..logging_utils import get_logger
+from .base import SeatProvider, SectionSnapshot, provides_sections
+from .bounded import ProviderTimeoutError
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the upstream while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a sliding window of recent calls.
+
+    The circuit opens when, over at least ``min_calls`` of the last ``window_size``
+    calls, the error rate reaches ``error_rate_threshold`` or the share of calls
+    slower than ``slow_call_seconds`` reaches ``slow_call_rate_threshold``. After
+    ``open_seconds`` up to ``half_open_max_calls`` probes are let through; if they all
+    succeed the circuit closes, otherwise it opens again.
+
+    Why: When an upstream degrades, failing fast frees connections and event-loop
+    time for healthy work and gives the upstream room to recover, instead of every
+    monitor waiting out its full timeout on each tick.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 10,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self._min_calls = min_calls
+        self._error_rate_threshold = error_rate_threshold
+        self._slow_call_seconds = slow_call_seconds
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._open_seconds = open_seconds
+        self._half_open_max_calls = max(1, half_open_max_calls)
+        # (failed, slow) per call, newest last
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._rejected = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call slot or raise ``CircuitOpenError``."""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and self._probes_in_flight < self._half_open_max_calls:
+            if self._state != HALF_OPEN:
+                self._transition(HALF_OPEN)
+            self._probes_in_flight += 1
+            return
+        self._rejected += 1
+        raise CircuitOpenError(f"Circuit for {self.name} is {state}")
+
+    def record(self, success: bool, latency_seconds: float) -> None:
+        slow = latency_seconds >= self._slow_call_seconds
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if not success or slow:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self._half_open_max_calls:
+                self._window.clear()
+                self._transition(CLOSED)
+            return
+        if self._state == OPEN:
+            # A call that started before the circuit opened; it tells us nothing new
+            return
+        self._window.append((not success, slow))
+        if len(self._window) < self._min_calls:
+            return
+        failures = sum(1 for failed, _ in self._window if failed)
+        slow_calls = sum(1 for _, is_slow in self._window if is_slow)
+        if (
+            failures / len(self._window) >= self._error_rate_threshold
+            or slow_calls / len(self._window) >= self._slow_call_rate_threshold
+        ):
+            self._open()
+
+    def release(self) -> None:
+        """Give back a reserved slot for a call that was abandoned (e.g. cancelled)."""
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "error_rate": (sum(1 for f, _ in self._window if f) / calls) if calls else 0.0,
+            "slow_rate": (sum(1 for _, s in self._window if s) / calls) if calls else 0.0,
+            "rejected_calls": self._rejected,
+            "times_opened": self._times_opened,
+        }
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            logger.warning("Circuit for %s: %s -> %s", self.name, self._state, state)
+        self._state = state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+
+class LatencyTracker:
+    """Rolling latency sample with a cached percentile."""
+
+    def __init__(self, window_size: int = 200, recompute_every: int = 20) -> None:
+        self._samples: Deque[float] = deque(maxlen=window_size)
+        self._recompute_every = recompute_every
+        self._since_recompute = 0
+        self._cache: Dict[float, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= min(self._recompute_every, len(self._samples)):
+            # Sorting a few hundred floats is cheap, but not on every single call
+            self._cache.clear()
+            self._since_recompute = 0
+
+    def percentile(self, q: float) -> float:
+        if q not in self._cache:
+            ordered = sorted(self._samples)
+            if not ordered:
+                return 0.0
+            self._cache[q] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return self._cache[q]
+
+
+class ResilientProvider(SeatProvider):
+    """
+    Wrap a provider with a (shared, per-host) circuit breaker and optional hedging.
+
+    With hedging enabled, if the first attempt has not finished after the observed
+    ``hedge_percentile`` latency, a second attempt is started and whichever answers
+    first wins; the other is cancelled. Hedging is skipped until ``hedge_min_samples``
+    latencies are known and while the breaker is probing a recovering upstream.
+    """
+
+    def __init__(
+        self,
+        inner: SeatProvider,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_delay_seconds: float = 0.05,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200,
+    ) -> None:
+        self._inner = inner
+        self._breaker = breaker
+        self._hedge = hedge
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_delay_seconds = hedge_min_delay_seconds
+        self._hedge_min_samples = hedge_min_samples
+        self._latency = LatencyTracker(window_size=latency_window)
+        self._calls = 0
+        self._hedges_sent = 0
+        self._hedge_wins = 0
+
+    @property
+    def sections_supported(self) -> bool:
+        return provides_sections(self._inner)
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        return await self._guarded(self._inner.fetch_available_seats, match_id)
+
+    async def fetch_sections(self, match_id: str) -> SectionSnapshot:
+        return await self._guarded(self._inner.fetch_sections, match_id)  # type: ignore[attr-defined]
+
+    async def _guarded(self, fetch: Callable[[str], Coroutine[Any, Any, T]], match_id: str) -> T:
+        if self._breaker is not None:
+            self._breaker.before_call()
+        self._calls += 1
+        start = time.monotonic()
+        try:
+            if self._should_hedge():
+                value = await self._fetch_hedged(fetch, match_id)
+            else:
+                value = await fetch(match_id)
+        except asyncio.CancelledError:
+            if self._breaker is not None:
+                self._breaker.release()
+            raise
+        except ProviderTimeoutError as exc:
+            if self._breaker is not None:
+                if exc.queued:
+                    # Our own concurrency cap was full; the upstream was never called
+                    self._breaker.release()
+                else:
+                    self._breaker.record(False, time.monotonic() - start)
+            raise
+        except Exception:
+            if self._breaker is not None:
+                self._breaker.record(False, time.monotonic() - start)
+            raise
+        elapsed = time.monotonic() - start
+        self._latency.add(elapsed)
+        if self._breaker is not None:
+            self._breaker.record(True, elapsed)
+        return value
+
+    async def aclose(self) -> None:
+        close = getattr(self._inner, "aclose", None)
+        if close is not None:
+            await close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "calls": self._calls,
+            "latency_p50_seconds": self._latency.percentile(0.5),
+            "latency_p95_seconds": self._latency.percentile(0.95),
+        }
+        if self._hedge:
+            stats["hedges_sent"] = self._hedges_sent
+            stats["hedge_wins"] = self._hedge_wins
+            stats["hedge_win_rate"] = self._hedge_wins / self._hedges_sent if self._hedges_sent else 0.0
+        if self._breaker is not None:
+            stats["circuit"] = {"host": self._breaker.name, **self._breaker.stats()}
+        inner_stats = getattr(self._inner, "stats", None)
+        if inner_stats is not None:
+            stats.update(inner_stats())
+        return stats
+
+    def _should_hedge(self) -> bool:
+        if not self._hedge or len(self._latency) < self._hedge_min_samples:
+            return False
+        return self._breaker is None or self._breaker.state == CLOSED
+
+    async def _fetch_hedged(self, fetch: Callable[[str], Coroutine[Any, Any, T]], match_id: str) -> T:
+        delay = max(self._hedge_min_delay_seconds, self._latency.percentile(self._hedge_percentile))
+        primary = asyncio.create_task(fetch(match_id))
+        hedge: Optional[asyncio.Task[T]] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            self._hedges_sent += 1
+            hedge = asyncio.create_task(fetch(match_id))
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
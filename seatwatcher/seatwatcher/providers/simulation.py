@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import time
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .base import SeatProvider, SectionSnapshot
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from ..config import CurveProfileConfig, ScenarioConfig
+
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+# Independent random streams per match; each draw is hash(seed, match, stream, counter)
+_PROFILE, _CAPACITY, _SELLOUT, _LEVEL, _NOISE = 1, 2, 3, 4, 5
+_RELEASE, _RELEASE_AT, _RELEASE_SIZE = 6, 7, 8
+_FAULT, _LATENCY_A, _LATENCY_B, _TAIL = 9, 10, 11, 12
+_SECTION_SHARE = 13
+
+
+class SimulatedUpstreamError(RuntimeError):
+    """A request the scenario decided should fail (as an HTTP 5xx would)."""
+
+
+class SimulatedTimeoutError(TimeoutError):
+    """A request the scenario decided should hang and then time out."""
+
+
+class ThrottledError(RuntimeError):
+    """Rejected by the scenario's rate limit (as an HTTP 429 would)."""
+
+    def __init__(self, retry_after_seconds: float) -> None:
+        super().__init__(f"Throttled; retry after {retry_after_seconds:.2f}s")
+        self.retry_after_seconds = retry_after_seconds
+
+
+def _mix(x: int) -> int:
+    # splitmix64 finalizer: a cheap, well-distributed 64-bit hash
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & _MASK
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & _MASK
+    return x ^ (x >> 31)
+
+
+def _lerp(bounds: Tuple[float, float], u: float) -> float:
+    return bounds[0] + (bounds[1] - bounds[0]) * u
+
+
+class _Match:
+    """Per-match parameters, drawn once from the match's hash and then fixed."""
+
+    __slots__ = ("key", "profile", "capacity", "sellout_seconds", "level", "requests", "shares")
+
+    def __init__(self, key: int, profile: CurveProfileConfig, capacity: int, sellout_seconds: float, level: float) -> None:
+        self.key = key
+        self.profile = profile
+        self.capacity = capacity
+        self.sellout_seconds = sellout_seconds
+        self.level = level
+        self.requests = 0
+        # Fraction of the venue in each of profile.sections, drawn on first use
+        self.shares: Optional[List[float]] = None
+
+
+class SimulationProvider(SeatProvider):
+    """
+    Scenario-driven fake upstream for load and failure testing.
+
+    Every random choice is a hash of ``(seed, match_id, stream, counter)`` rather
+    than a draw from a shared RNG: a match's availability at a given scenario time,
+    and the outcome of its n-th request, are the same on every run regardless of
+    how many other matches there are or in which order they are polled.
+
+    Availability follows the match's profile curve (sell-out, steady or sold out)
+    plus jitter and sudden releases. Requests get log-normal latency with a Pareto
+    tail, and may fail, hang until a timeout, or be throttled.
+
+    Why: Scheduler, DB and notifier changes need realistic load (100k matches,
+    bursts of alerts, slow and failing upstreams) without a real vendor. Per-match
+    state is a few small ints, so 100k matches cost a few tens of MB and a fetch a
+    few microseconds of CPU besides its simulated latency.
+    """
+
+    def __init__(self, scenario: ScenarioConfig, seed: Optional[int] = None) -> None:
+        self._scenario = scenario
+        self._seed = scenario.seed if seed is None else seed
+        self._matches: Dict[str, _Match] = {}
+        self._weights: List[Tuple[float, CurveProfileConfig]] = []
+        # Profiles pinned to match_id patterns are not drawn for other matches
+        weighted = [p for p in scenario.profiles if not p.match_ids] or list(scenario.profiles)
+        total = sum(p.weight for p in weighted)
+        cumulative = 0.0
+        for profile in weighted:
+            cumulative += profile.weight / total
+            self._weights.append((cumulative, profile))
+        self._started = time.monotonic()
+        throttle = scenario.throttle
+        self._tokens = float(throttle.burst)
+        self._tokens_at = self._started
+        self._requests = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._throttled = 0
+
+    def elapsed(self) -> float:
+        """Scenario seconds since the provider was created."""
+        return (time.monotonic() - self._started) * self._scenario.time_scale
+
+    @property
+    def sections_supported(self) -> bool:
+        return any(profile.sections for profile in self._scenario.profiles)
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        await self._request(match_id)
+        return self.seats_at(match_id, self.elapsed())
+
+    async def fetch_sections(self, match_id: str) -> SectionSnapshot:
+        await self._request(match_id)
+        t = self.elapsed()
+        return SectionSnapshot(self.seats_at(match_id, t), self.sections_at(match_id, t))
+
+    async def _request(self, match_id: str) -> None:
+        """Play out one request's throttling, faults and latency."""
+        match = self._match(match_id)
+        n = match.requests
+        match.requests += 1
+        self._requests += 1
+        latency = self._latency(match.key, n)
+        if self._throttle():
+            self._throttled += 1
+            # A 429 comes back quickly; don't make the caller wait out a tail
+            await asyncio.sleep(min(latency, self._scenario.latency.median_ms / 1000.0))
+            raise ThrottledError(1.0 / self._scenario.throttle.requests_per_second)
+        faults = self._scenario.faults
+        u = self._uniform(match.key, _FAULT, n)
+        if u < faults.timeout_rate:
+            self._timeouts += 1
+            await asyncio.sleep(faults.timeout_seconds)
+            raise SimulatedTimeoutError(f"Simulated timeout for {match_id} after {faults.timeout_seconds}s")
+        await asyncio.sleep(latency)
+        if u < faults.timeout_rate + faults.error_rate:
+            self._errors += 1
+            raise SimulatedUpstreamError(f"Simulated upstream error for {match_id}")
+
+    def sections_at(self, match_id: str, t: float) -> Dict[str, int]:
+        """Availability per section at scenario time ``t``; seats are split by fixed per-match shares."""
+        match = self._match(match_id)
+        seats = self.seats_at(match_id, t)
+        names = match.profile.sections
+        if not names:
+            return {"general": seats}
+        if match.shares is None:
+            weights = [0.5 + self._uniform(match.key, _SECTION_SHARE, i) for i in range(len(names))]
+            total = sum(weights)
+            match.shares = [w / total for w in weights]
+        split = [int(seats * share) for share in match.shares]
+        # Hand the rounding remainder to the first sections so the total is exact
+        for i in range(seats - sum(split)):
+            split[i % len(split)] += 1
+        return dict(zip(names, split))
+
+    def seats_at(self, match_id: str, t: float) -> int:
+        """Availability of ``match_id`` at scenario time ``t`` (seconds), without side effects."""
+        match = self._match(match_id)
+        profile = match.profile
+        capacity = match.capacity
+        if profile.kind == "sellout":
+            remaining = max(0.0, 1.0 - t / match.sellout_seconds)
+            # Convex: most seats go early, the last ones trickle out
+            base = capacity * remaining * remaining
+        elif profile.kind == "steady":
+            base = capacity * match.level
+        else:
+            base = 0.0
+        if profile.noise and base > 0:
+            bucket = int(t // profile.noise_period_seconds)
+            base += (2.0 * self._uniform(match.key, _NOISE, bucket) - 1.0) * profile.noise * capacity
+        seats = max(0.0, base) + self._released(match, t)
+        return int(min(seats, capacity))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "matches": len(self._matches),
+            "requests": self._requests,
+            "errors": self._errors,
+            "timeouts": self._timeouts,
+            "throttled": self._throttled,
+            "scenario_seconds": round(self.elapsed(), 3),
+        }
+
+    def _uniform(self, key: int, stream: int, counter: int) -> float:
+        """Uniform in (0, 1), a pure function of its arguments."""
+        x = _mix(((key + stream * _GOLDEN) & _MASK) ^ ((counter * 0xD1B54A32D192ED03) & _MASK))
+        return (x + 0.5) / 18446744073709551616.0
+
+    def _match(self, match_id: str) -> _Match:
+        match = self._matches.get(match_id)
+        if match is not None:
+            return match
+        digest = hashlib.blake2b(match_id.encode("utf-8"), digest_size=8).digest()
+        key = _mix(int.from_bytes(digest, "little") ^ (self._seed * _GOLDEN & _MASK))
+        profile = self._profile_for(match_id, self._uniform(key, _PROFILE, 0))
+        match = _Match(
+            key=key,
+            profile=profile,
+            capacity=int(round(_lerp(profile.capacity, self._uniform(key, _CAPACITY, 0)))),
+            sellout_seconds=max(1.0, _lerp(profile.sellout_seconds, self._uniform(key, _SELLOUT, 0))),
+            level=_lerp(profile.level, self._uniform(key, _LEVEL, 0)),
+        )
+        self._matches[match_id] = match
+        return match
+
+    def _profile_for(self, match_id: str, u: float) -> CurveProfileConfig:
+        for profile in self._scenario.profiles:
+            if any(fnmatchcase(match_id, pattern) for pattern in profile.match_ids):
+                return profile
+        for cumulative, profile in self._weights:
+            if u < cumulative:
+                return profile
+        return self._weights[-1][1]
+
+    def _released(self, match: _Match, t: float) -> float:
+        profile = match.profile
+        if not profile.release_rate_per_hour:
+            return 0.0
+        slot_seconds = self._scenario.release_slot_seconds
+        chance = min(1.0, profile.release_rate_per_hour * slot_seconds / 3600.0)
+        current = int(t // slot_seconds)
+        # Only slots recent enough for their release to still be on sale matter
+        lookback = int(math.ceil(profile.release_sellout_seconds / slot_seconds))
+        total = 0.0
+        for slot in range(max(0, current - lookback), current + 1):
+            if self._uniform(match.key, _RELEASE, slot) >= chance:
+                continue
+            at = (slot + self._uniform(match.key, _RELEASE_AT, slot)) * slot_seconds
+            if at > t:
+                continue
+            size = _lerp(profile.release_size, self._uniform(match.key, _RELEASE_SIZE, slot))
+            total += size * max(0.0, 1.0 - (t - at) / profile.release_sellout_seconds)
+        return total
+
+    def _latency(self, key: int, n: int) -> float:
+        cfg = self._scenario.latency
+        if self._uniform(key, _TAIL, n) < cfg.tail_probability:
+            # Pareto tail via inverse CDF, reusing an independent stream for the draw
+            ms = cfg.tail_min_ms * self._uniform(key, _LATENCY_A, n) ** (-1.0 / cfg.tail_alpha)
+        elif cfg.median_ms <= 0:
+            return 0.0
+        else:
+            # Box-Muller standard normal from two independent uniforms
+            z = math.sqrt(-2.0 * math.log(self._uniform(key, _LATENCY_A, n))) * math.cos(
+                2.0 * math.pi * self._uniform(key, _LATENCY_B, n)
+            )
+            ms = cfg.median_ms * math.exp(cfg.sigma * z)
+        return min(ms, cfg.max_ms) / 1000.0
+
+    def _throttle(self) -> bool:
+        rate = self._scenario.throttle.requests_per_second
+        if rate is None:
+            return False
+        now = time.monotonic()
+        self._tokens = min(float(self._scenario.throttle.burst), self._tokens + (now - self._tokens_at) * rate)
+        self._tokens_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return False
+        return True
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from string import Template
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+import jmespath
+
+from ..logging_utils import get_logger
+from .base import SeatProvider, SeatUpdate, StreamingSeatProvider
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Subscription:
+    """One stream connection and the match ids its URL subscribes to."""
+
+    url: str
+    match_ids: List[str]
+    last_event_id: Optional[str] = None
+    connected: bool = False
+    disconnected_since: float = field(default_factory=time.monotonic)
+
+
+class _PendingUpdates:
+    """
+    The latest unconsumed value per match_id, handed out as one batch.
+
+    Why: If the consumer falls behind (slow DB writes), a newer push for a match
+    replaces the older one instead of queueing behind it, so memory is bounded by
+    the number of matches rather than by how long the backlog lasts.
+    """
+
+    def __init__(self) -> None:
+        self._latest: Dict[str, int] = {}
+        self._ready = asyncio.Event()
+
+    def put(self, updates: list[SeatUpdate]) -> None:
+        for match_id, seats in updates:
+            self._latest[match_id] = seats
+        self._ready.set()
+
+    async def get(self) -> list[SeatUpdate]:
+        await self._ready.wait()
+        self._ready.clear()
+        batch, self._latest = list(self._latest.items()), {}
+        return batch
+
+
+@dataclass
+class SseProvider(StreamingSeatProvider):
+    """
+    Push-based provider consuming a Server-Sent Events feed.
+
+    One persistent connection per upstream carries updates for every subscribed
+    match_id (the ids are substituted into ``url_template`` as ``$match_ids``).
+    Reconnects resume from the last seen event id via the standard ``Last-Event-ID``
+    header. While the stream is down for longer than ``fallback_after_seconds`` the
+    optional ``fallback`` provider is polled so we never go blind.
+
+    Ids that would make the URL longer than ``max_url_length`` are split across
+    several connections, each resuming from its own last event id; many servers
+    and proxies reject request lines over 8 KB.
+    """
+
+    url_template: str
+    match_id_jmespath: str = "match_id"
+    seats_jmespath: str = "seats"
+    headers: Optional[Dict[str, str]] = None
+    read_timeout_seconds: float = 60.0
+    reconnect_initial_seconds: float = 1.0
+    reconnect_max_seconds: float = 30.0
+    fallback: Optional[SeatProvider] = None
+    fallback_after_seconds: float = 10.0
+    fallback_interval_seconds: float = 15.0
+    max_url_length: int = 8000
+
+    _latest: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Compile once; the expressions run for every pushed event
+        self._match_id_expr = jmespath.compile(self.match_id_jmespath)
+        self._seats_expr = jmespath.compile(self.seats_jmespath)
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        # Serve the freshest pushed value; only hit the upstream when we have none
+        if match_id in self._latest:
+            return self._latest[match_id]
+        if self.fallback is not None:
+            return await self.fallback.fetch_available_seats(match_id)
+        raise RuntimeError(f"No streamed value received yet for {match_id}")
+
+    async def aclose(self) -> None:
+        close = getattr(self.fallback, "aclose", None)
+        if close is not None:
+            await close()
+
+    async def stream(self, match_ids: list[str]) -> AsyncIterator[list[SeatUpdate]]:
+        queue = _PendingUpdates()
+        subscriptions = self._subscriptions(match_ids)
+        tasks = [asyncio.create_task(self._connection_loop(sub, queue)) for sub in subscriptions]
+        if self.fallback is not None:
+            tasks.append(asyncio.create_task(self._fallback_loop(subscriptions, queue)))
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _subscriptions(self, match_ids: list[str]) -> List[_Subscription]:
+        """Pack match ids into as few URLs as fit in ``max_url_length``."""
+        if "\x00" not in Template(self.url_template).safe_substitute({"match_ids": "\x00"}):
+            # The URL does not list the ids, so there is nothing to split
+            return [_Subscription(self._url([]), list(match_ids))]
+        budget = self.max_url_length - len(self._url([]))
+        chunks: List[List[str]] = [[]]
+        length = 0
+        for match_id in match_ids:
+            # +1 for the separating comma; an id too long on its own still gets a URL
+            size = len(quote(match_id, safe="")) + 1
+            if chunks[-1] and length + size > budget:
+                chunks.append([])
+                length = 0
+            chunks[-1].append(match_id)
+            length += size
+        return [_Subscription(self._url(ids), ids) for ids in chunks]
+
+    def _url(self, match_ids: List[str]) -> str:
+        return Template(self.url_template).safe_substitute(
+            {"match_ids": ",".join(quote(m, safe="") for m in match_ids)}
+        )
+
+    async def _connection_loop(self, sub: _Subscription, queue: _PendingUpdates) -> None:
+        url = sub.url
+        delay = self.reconnect_initial_seconds
+        # A quiet stream is legitimate, so reads get their own (long) timeout; servers
+        # keep the connection alive with heartbeat comments well within it.
+        timeout = httpx.Timeout(10.0, read=self.read_timeout_seconds)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            while True:
+                headers = {"Accept": "text/event-stream", **(self.headers or {})}
+                if sub.last_event_id is not None:
+                    headers["Last-Event-ID"] = sub.last_event_id
+                try:
+                    async with client.stream("GET", url, headers=headers) as response:
+                        response.raise_for_status()
+                        sub.connected = True
+                        delay = self.reconnect_initial_seconds
+                        logger.info("SSE stream connected: %s (%d matches)", url, len(sub.match_ids))
+                        retry_ms = await self._consume(response, queue, sub)
+                        if retry_ms is not None:
+                            delay = retry_ms / 1000.0
+                    logger.warning("SSE stream closed by server: %s", url)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("SSE stream error on %s: %s", url, exc)
+                if sub.connected:
+                    sub.connected = False
+                    sub.disconnected_since = time.monotonic()
+                await asyncio.sleep(delay)
+                # Exponential backoff so a down upstream is not hammered by reconnects
+                delay = min(delay * 2, self.reconnect_max_seconds)
+
+    async def _consume(
+        self, response: httpx.Response, queue: _PendingUpdates, sub: _Subscription
+    ) -> Optional[int]:
+        """
+        Parse the event stream until the server closes it.
+
+        Returns the last ``retry:`` value the server asked for, if any.
+        """
+        data_lines: List[str] = []
+        event_id: Optional[str] = None
+        retry_ms: Optional[int] = None
+        async for line in response.aiter_lines():
+            if line == "":
+                # Blank line dispatches the accumulated event
+                if data_lines:
+                    updates = self._parse_event("\n".join(data_lines))
+                    if updates:
+                        queue.put(updates)
+                if event_id is not None:
+                    sub.last_event_id = event_id
+                data_lines, event_id = [], None
+                continue
+            if line.startswith(":"):
+                continue  # comment / heartbeat
+            name, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+            if name == "data":
+                data_lines.append(value)
+            elif name == "id":
+                event_id = value
+            elif name == "retry" and value.isdigit():
+                retry_ms = int(value)
+        return retry_ms
+
+    def _parse_event(self, raw: str) -> list[SeatUpdate]:
+        try:
+            payload: Any = json.loads(raw)
+        except ValueError:
+            logger.warning("Ignoring non-JSON SSE event: %r", raw[:200])
+            return []
+        items = payload if isinstance(payload, list) else [payload]
+        updates: list[SeatUpdate] = []
+        for item in items:
+            match_id = self._match_id_expr.search(item)
+            seats = self._seats_expr.search(item)
+            if match_id is None or seats is None:
+                logger.debug("Ignoring SSE item without match_id/seats: %r", item)
+                continue
+            try:
+                value = int(seats)
+            except (TypeError, ValueError):
+                logger.warning("Ignoring SSE item with non-integer seats: %r", seats)
+                continue
+            self._latest[str(match_id)] = value
+            updates.append((str(match_id), value))
+        return updates
+
+    async def _fallback_loop(self, subscriptions: List[_Subscription], queue: _PendingUpdates) -> None:
+        assert self.fallback is not None
+        while True:
+            await asyncio.sleep(self.fallback_interval_seconds)
+            now = time.monotonic()
+            # Only matches whose own connection is down need polling
+            match_ids = [
+                match_id
+                for sub in subscriptions
+                if not sub.connected and now - sub.disconnected_since >= self.fallback_after_seconds
+                for match_id in sub.match_ids
+            ]
+            if not match_ids:
+                continue
+            logger.info("SSE stream down; polling fallback for %d matches", len(match_ids))
+            results = await asyncio.gather(
+                *(self.fallback.fetch_available_seats(m) for m in match_ids),
+                return_exceptions=True,
+            )
+            updates: list[SeatUpdate] = []
+            for match_id, result in zip(match_ids, results):
+                if isinstance(result, BaseException):
+                    logger.warning("Fallback poll failed for %s: %s", match_id, result)
+                    continue
+                self._latest[match_id] = result
+                updates.append((match_id, result))
+            if updates:
+                queue.put(updates)
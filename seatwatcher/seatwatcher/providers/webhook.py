@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..logging_utils import get_logger
+from ..utils.httpserver import Request, Response, start_http_server
+from ..utils.secrets import read_env_or_file
+from .base import SeatUpdate, StreamingSeatProvider, check_seats
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WebhookProvider(StreamingSeatProvider):
+    """
+    Push provider fed by partners POSTing availability changes to us.
+
+    Accepted bodies are either ``{"updates": [...]}`` or a bare JSON array of
+    ``{"match_id": str, "seats": int}`` objects. When an HMAC secret is configured the
+    raw body must be signed with HMAC-SHA256 and sent as ``sha256=<hex>`` in
+    ``signature_header``.
+
+    Why a bounded queue: ingestion is far cheaper than recording and evaluating, so
+    under a burst we answer 429 and let the partner retry rather than buffering
+    without limit.
+    """
+
+    host: str = "0.0.0.0"
+    port: int = 8080
+    path: str = "/webhook/seats"
+    hmac_secret_env: Optional[str] = None
+    hmac_secret_file_env: Optional[str] = None
+    signature_header: str = "X-Seatwatcher-Signature"
+    max_queue_batches: int = 1000
+    max_batch_updates: int = 10_000
+    max_body_bytes: int = 1_048_576
+
+    _latest: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _queue: Optional[asyncio.Queue[list[SeatUpdate]]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        secret = None
+        if self.hmac_secret_env or self.hmac_secret_file_env:
+            secret = read_env_or_file(self.hmac_secret_env or "", self.hmac_secret_file_env)
+            if not secret:
+                raise RuntimeError("Webhook HMAC secret configured but not found in env or file env.")
+        self._secret: Optional[bytes] = secret.encode("utf-8") if secret else None
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        if match_id in self._latest:
+            return self._latest[match_id]
+        raise RuntimeError(f"No webhook update received yet for {match_id}")
+
+    async def stream(self, match_ids: list[str]) -> AsyncIterator[list[SeatUpdate]]:
+        self._queue = asyncio.Queue(maxsize=self.max_queue_batches)
+        server = await start_http_server(
+            self._handle, host=self.host, port=self.port, max_body_bytes=self.max_body_bytes
+        )
+        logger.info("Webhook receiver listening on %s:%s%s", self.host, self.port, self.path)
+        try:
+            while True:
+                batch = await self._queue.get()
+                # Coalesce whatever else is already waiting so the consumer handles
+                # one large batch (one DB transaction) instead of many small ones
+                while not self._queue.empty() and len(batch) < self.max_batch_updates:
+                    batch.extend(self._queue.get_nowait())
+                yield batch
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def _handle(self, request: Request) -> Response:
+        if request.path != self.path:
+            return Response.json(404, {"error": "not found"})
+        if request.method != "POST":
+            return Response.json(405, {"error": "method not allowed"})
+        if self._secret is not None and not self._verify(request):
+            return Response.json(401, {"error": "invalid signature"})
+        try:
+            updates = self._parse(request.body)
+        except ValueError as exc:
+            return Response.json(400, {"error": str(exc)})
+        if len(updates) > self.max_batch_updates:
+            return Response.json(413, {"error": f"at most {self.max_batch_updates} updates per request"})
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(updates)
+        except asyncio.QueueFull:
+            return Response.json(429, {"error": "ingest queue full"}, headers={"Retry-After": "1"})
+        for match_id, seats in updates:
+            self._latest[match_id] = seats
+        return Response.json(202, {"accepted": len(updates)})
+
+    def _verify(self, request: Request) -> bool:
+        assert self._secret is not None
+        provided = request.headers.get(self.signature_header.lower(), "")
+        expected = "sha256=" + hmac.new(self._secret, request.body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(provided, expected)
+
+    @staticmethod
+    def _parse(body: bytes) -> list[SeatUpdate]:
+        try:
+            payload: Any = json.loads(body)
+        except ValueError as exc:
+            raise ValueError(f"body is not valid JSON: {exc}")
+        items = payload.get("updates") if isinstance(payload, dict) else payload
+        if not isinstance(items, list):
+            raise ValueError("expected a JSON array of updates or {\"updates\": [...]}")
+        updates: list[SeatUpdate] = []
+        for item in items:
+            if not isinstance(item, dict) or "match_id" not in item or "seats" not in item:
+                raise ValueError(f"update must have match_id and seats: {item!r}")
+            seats = item["seats"]
+            if isinstance(seats, bool) or not isinstance(seats, int):
+                raise ValueError(f"seats must be an integer: {seats!r}")
+            updates.append((str(item["match_id"]), check_seats(seats)))
+        return updates
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import csv
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .config import MonitorConfig
+from .models import Observation
+from .rules import THRESHOLD
+
+
+# Observations are pulled from the DB in partitions of this many rows
+_CHUNK_ROWS = 100_000
+
+
+@dataclass
+class ObservationColumns:
+    """
+    Columnar observation history, sorted by (match, time).
+
+    ``codes`` index into ``match_ids``; ``times`` are epoch seconds (UTC).
+    """
+
+    match_ids: List[str]
+    codes: np.ndarray
+    times: np.ndarray
+    seats: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.codes.size)
+
+    def window(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> "ObservationColumns":
+        """Rows with ``since <= created_at < until``; naive datetimes are taken as UTC."""
+        if since is None and until is None:
+            return self
+        lo = _to_epoch(since) if since else float("-inf")
+        hi = _to_epoch(until) if until else float("inf")
+        mask = (self.times >= lo) & (self.times < hi)
+        return ObservationColumns(self.match_ids, self.codes[mask], self.times[mask], self.seats[mask])
+
+
+@dataclass
+class ReplayResult:
+    seat_threshold_min: Optional[int]
+    min_notify_interval_seconds: Optional[int]
+    alerts: int
+    alerts_per_channel: Dict[str, int]
+    alerts_per_match: Dict[str, int] = field(default_factory=dict)
+    # Monitors left out because replay cannot model their rules
+    skipped_monitors: List[str] = field(default_factory=list)
+
+
+def _to_epoch(value: datetime) -> float:
+    # SQLite hands back naive datetimes; everything we write is UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _parse_time(raw: str) -> float:
+    try:
+        return float(raw)
+    except ValueError:
+        return _to_epoch(datetime.fromisoformat(raw))
+
+
+def _build_columns(rows: Iterable[Tuple[str, float, int]]) -> ObservationColumns:
+    """Intern match ids and sort rows into (match, time) order."""
+    match_ids: List[str] = []
+    index: Dict[str, int] = {}
+    code_chunks: List[np.ndarray] = []
+    time_chunks: List[np.ndarray] = []
+    seat_chunks: List[np.ndarray] = []
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, _CHUNK_ROWS))
+        if not chunk:
+            break
+        codes = np.empty(len(chunk), dtype=np.int32)
+        for i, (match_id, _, _) in enumerate(chunk):
+            code = index.get(match_id)
+            if code is None:
+                code = index[match_id] = len(match_ids)
+                match_ids.append(match_id)
+            codes[i] = code
+        code_chunks.append(codes)
+        time_chunks.append(np.fromiter((r[1] for r in chunk), dtype=np.float64, count=len(chunk)))
+        seat_chunks.append(np.fromiter((r[2] for r in chunk), dtype=np.int64, count=len(chunk)))
+
+    if not code_chunks:
+        empty = np.empty(0)
+        return ObservationColumns([], empty.astype(np.int32), empty, empty.astype(np.int64))
+    codes = np.concatenate(code_chunks)
+    times = np.concatenate(time_chunks)
+    seats = np.concatenate(seat_chunks)
+    order = np.lexsort((times, codes))
+    return ObservationColumns(match_ids, codes[order], times[order], seats[order])
+
+
+def load_observations_from_db(
+    session: Session,
+    match_ids: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> ObservationColumns:
+    """
+    Stream observations out of the database into columnar arrays.
+
+    Why: Rows are fetched in server-side partitions and never materialized as ORM
+    objects, so months of history fit comfortably in memory as three arrays.
+    """
+    stmt = select(Observation.match_id, Observation.created_at, Observation.seats_available)
+    if match_ids is not None:
+        stmt = stmt.where(Observation.match_id.in_(list(match_ids)))
+    if since is not None:
+        stmt = stmt.where(Observation.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Observation.created_at < until)
+    result = session.execute(stmt.execution_options(yield_per=_CHUNK_ROWS))
+    return _build_columns((m, _to_epoch(t), s) for m, t, s in result)
+
+
+def load_observations_from_csv(path: str, match_ids: Optional[Sequence[str]] = None) -> ObservationColumns:
+    """
+    Load observations exported by ``export_observations_csv``.
+
+    ``created_at`` may be an ISO-8601 timestamp or epoch seconds.
+    """
+    wanted = set(match_ids) if match_ids is not None else None
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        reader = csv.DictReader(fh)
+        rows = (
+            (r["match_id"], _parse_time(r["created_at"]), int(r["seats_available"]))
+            for r in reader
+            if wanted is None or r["match_id"] in wanted
+        )
+        return _build_columns(rows)
+
+
+def export_observations_csv(session: Session, path: str) -> int:
+    count = 0
+    stmt = select(Observation.created_at, Observation.match_id, Observation.seats_available)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["created_at", "match_id", "seats_available"])
+        for created_at, match_id, seats in session.execute(stmt.execution_options(yield_per=_CHUNK_ROWS)):
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            writer.writerow([created_at.isoformat(), match_id, seats])
+            count += 1
+    return count
+
+
+def simulate_alerts(
+    columns: ObservationColumns,
+    thresholds: np.ndarray,
+    intervals: np.ndarray,
+) -> np.ndarray:
+    """
+    Return the indices of observations that would have triggered a notification.
+
+    ``thresholds`` and ``intervals`` are per-match arrays indexed by match code;
+    a negative threshold disables the match. Dedup mirrors the live watcher: an alert
+    is suppressed while the previous one is within the notify interval, measured in
+    observation (virtual) time.
+
+    Why vectorized: the threshold test is a single mask over all rows. Dedup is
+    inherently sequential per match, so instead of looping over rows we advance every
+    match's cursor at once with ``searchsorted``; the loop runs once per alert of the
+    busiest match, not once per observation.
+    """
+    if len(columns) == 0:
+        return np.empty(0, dtype=np.int64)
+    row_thresholds = thresholds[columns.codes]
+    candidates = np.flatnonzero((row_thresholds >= 0) & (columns.seats >= row_thresholds))
+    if candidates.size == 0:
+        return candidates
+
+    cand_codes = columns.codes[candidates]
+    cand_intervals = intervals[cand_codes].astype(np.float64)
+    # Give each match its own disjoint stretch of a single sorted key axis so one
+    # searchsorted call can never jump from one match into the next
+    t0 = float(columns.times.min())
+    span = float(columns.times.max()) - t0 + float(intervals.max(initial=0)) + 1.0
+    keys = cand_codes.astype(np.float64) * span + (columns.times[candidates] - t0)
+
+    # First candidate and (exclusive) end of each match's run of candidates
+    starts = np.flatnonzero(np.r_[True, cand_codes[1:] != cand_codes[:-1]])
+    ends = np.r_[starts[1:], cand_codes.size]
+
+    no_dedup = cand_intervals <= 0
+    fired: List[np.ndarray] = [np.flatnonzero(no_dedup)]
+    pos, end = starts, ends
+    keep = ~no_dedup[pos]
+    pos, end = pos[keep], end[keep]
+    while pos.size:
+        fired.append(pos)
+        # Live dedup skips while last >= now - interval, so the next alert needs a
+        # strictly later time than last + interval
+        nxt = np.searchsorted(keys, keys[pos] + cand_intervals[pos], side="right")
+        alive = nxt < end
+        pos, end = nxt[alive], end[alive]
+    return candidates[np.unique(np.concatenate(fired))]
+
+
+def replay_threshold(monitor: MonitorConfig) -> Optional[int]:
+    """
+    The seat threshold replay uses for ``monitor``, or ``None`` if it cannot model it.
+
+    Replay simulates level thresholds only. A monitor whose rules are all
+    ``seats >= N`` alerts exactly when seats reach the smallest N; edge-triggered and
+    sustained rules depend on the previous observation or on elapsed time and are
+    not modelled. Neither are monitors filtering ``sections``: only the venue total
+    is stored in ``seats_available``.
+    """
+    rules = monitor.compiled_rules
+    if monitor.sections or any(rule.kind != THRESHOLD for rule in rules):
+        return None
+    return min(rule.value for rule in rules)
+
+
+def replay(
+    columns: ObservationColumns,
+    monitors: Sequence[MonitorConfig],
+    thresholds: Sequence[Optional[int]] = (None,),
+    intervals: Sequence[Optional[int]] = (None,),
+    channel_types: Optional[Mapping[str, str]] = None,
+) -> List[ReplayResult]:
+    """
+    Replay history for every (threshold, interval) combination.
+
+    ``None`` in either sweep list means "use each monitor's configured value".
+    Monitors whose rules cannot be replayed (see ``replay_threshold``) are left out
+    and listed in each result's ``skipped_monitors``.
+
+    ``channel_types`` maps notifier names to their ``type``. The live watcher records
+    and dedups notifications under the notifier's type, so two notifiers of one type
+    suppress each other; alerts are still reported per notifier name. Names missing
+    from the mapping are taken as their own type.
+    """
+    types = dict(channel_types or {})
+    index = {m: i for i, m in enumerate(columns.match_ids)}
+    base_thresholds: Dict[int, int] = {}
+    skipped: List[str] = []
+    for m in monitors:
+        base = replay_threshold(m)
+        if base is None:
+            skipped.append(m.name)
+        else:
+            base_thresholds[id(m)] = base
+    # Only monitors whose match appears in the history take part
+    active = [m for m in monitors if m.match_id in index and id(m) in base_thresholds]
+    independent, coupled = _split_by_shared_channels(active, types)
+    results: List[ReplayResult] = []
+    for threshold, interval in itertools.product(thresholds, intervals):
+        per_channel: Dict[str, int] = {ch: 0 for m in monitors for ch in m.channels}
+        per_match: Dict[str, int] = {}
+        total = 0
+        # Live dedup is keyed by (match_id, channel). Monitors that share no channel
+        # with another monitor on their match are independent and replayed
+        # vectorized, grouped so several monitors on one match do not clobber each
+        # other's per-match thresholds
+        for group in _monitor_groups(independent):
+            thr = np.full(len(columns.match_ids), -1, dtype=np.int64)
+            itv = np.zeros(len(columns.match_ids), dtype=np.int64)
+            for m in group:
+                code = index[m.match_id]
+                thr[code] = base_thresholds[id(m)] if threshold is None else threshold
+                itv[code] = m.min_notify_interval_seconds if interval is None else interval
+            fired = simulate_alerts(columns, thr, itv)
+            counts = np.bincount(columns.codes[fired], minlength=len(columns.match_ids))
+            for m in group:
+                n = int(counts[index[m.match_id]])
+                total += n
+                per_match[m.match_id] = per_match.get(m.match_id, 0) + n
+                for ch in m.channels:
+                    per_channel[ch] += n
+        # Monitors on one match sharing a channel suppress each other's alerts
+        for members in coupled:
+            counts_shared = _simulate_shared(
+                columns,
+                index[members[0].match_id],
+                members,
+                [base_thresholds[id(m)] if threshold is None else threshold for m in members],
+                [m.min_notify_interval_seconds if interval is None else interval for m in members],
+                types,
+            )
+            for m, n in zip(members, counts_shared):
+                total += n
+                per_match[m.match_id] = per_match.get(m.match_id, 0) + n
+                for ch in m.channels:
+                    per_channel[ch] += n
+        results.append(
+            ReplayResult(
+                seat_threshold_min=threshold,
+                min_notify_interval_seconds=interval,
+                alerts=total,
+                alerts_per_channel=per_channel,
+                alerts_per_match=per_match,
+                skipped_monitors=list(skipped),
+            )
+        )
+    return results
+
+
+def _split_by_shared_channels(
+    monitors: Sequence[MonitorConfig],
+    channel_types: Mapping[str, str],
+) -> Tuple[List[MonitorConfig], List[List[MonitorConfig]]]:
+    """
+    Separate monitors that dedup on their own from sets that dedup together.
+
+    Returns the monitors that share no channel with another monitor on the same
+    match, and the remaining monitors grouped into sets that are connected through
+    shared channels on one match (in config order). Channels are compared by
+    notifier type, as live dedup does.
+    """
+    by_match: Dict[str, List[MonitorConfig]] = {}
+    for m in monitors:
+        by_match.setdefault(m.match_id, []).append(m)
+    independent: List[MonitorConfig] = []
+    coupled: List[List[MonitorConfig]] = []
+    for members in by_match.values():
+        # Union-find over positions: monitors sharing a channel end up with one root
+        parent = list(range(len(members)))
+        owner: Dict[str, int] = {}
+        for i, m in enumerate(members):
+            for ch in _dedup_keys(m, channel_types):
+                if ch in owner:
+                    parent[_root(parent, i)] = _root(parent, owner[ch])
+                else:
+                    owner[ch] = i
+        groups: Dict[int, List[MonitorConfig]] = {}
+        for i, m in enumerate(members):
+            groups.setdefault(_root(parent, i), []).append(m)
+        for group in groups.values():
+            if len(group) == 1:
+                independent.extend(group)
+            else:
+                coupled.append(group)
+    return independent, coupled
+
+
+def _dedup_keys(monitor: MonitorConfig, channel_types: Mapping[str, str]) -> Set[str]:
+    """The keys live dedup uses for ``monitor``'s channels (their notifier types)."""
+    return {channel_types.get(ch, ch) for ch in monitor.channels}
+
+
+def _root(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        i = parent[i]
+    return i
+
+
+def _simulate_shared(
+    columns: ObservationColumns,
+    code: int,
+    members: Sequence[MonitorConfig],
+    thresholds: Sequence[int],
+    intervals: Sequence[int],
+    channel_types: Mapping[str, str],
+) -> List[int]:
+    """
+    Count alerts for monitors on one match that share channels.
+
+    Mirrors ``last_notification_within``: a monitor is skipped while any of its
+    channels was notified for the match within the monitor's own interval, no matter
+    which monitor sent it. This is a scalar loop, but it only covers coupled matches'
+    rows at or above the lowest threshold.
+    """
+    lo, hi = np.searchsorted(columns.codes, [code, code + 1])
+    times = columns.times[lo:hi]
+    seats = columns.seats[lo:hi]
+    rows = np.flatnonzero(seats >= min(thresholds))
+    keys = [_dedup_keys(m, channel_types) for m in members]
+    last: Dict[str, float] = {}
+    counts = [0] * len(members)
+    for t, s in zip(times[rows].tolist(), seats[rows].tolist()):
+        for i in range(len(members)):
+            if s < thresholds[i]:
+                continue
+            if intervals[i] > 0 and any(last.get(ch, float("-inf")) >= t - intervals[i] for ch in keys[i]):
+                continue
+            counts[i] += 1
+            for ch in keys[i]:
+                last[ch] = t
+    return counts
+
+
+def _monitor_groups(monitors: Sequence[MonitorConfig]) -> List[List[MonitorConfig]]:
+    """Split monitors into groups with at most one monitor per match_id."""
+    groups: List[List[MonitorConfig]] = []
+    seen: List[set[str]] = []
+    for m in monitors:
+        for group, ids in zip(groups, seen):
+            if m.match_id not in ids:
+                group.append(m)
+                ids.add(m.match_id)
+                break
+        else:
+            groups.append([m])
+            seen.append({m.match_id})
+    return groups
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Tuple
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, insert, select
 from sqlalchemy.orm import Session
 
 from .models import NotificationLog, Observation
@@ -19,6 +19,50 @@ def record_observation(session: Session, match_id: str, seats_available: int) ->
     return obs
 
 
+def record_observations(
+    session: Session,
+    observations: Iterable[Tuple[str, int, Optional[bytes]]],
+) -> int:
+    """
+    Insert many observations in a single executemany round trip.
+
+    Each row is ``(match_id, seats, sections_blob)``; the blob may be ``None``.
+
+    Why: Push providers can deliver thousands of updates per second; building ORM
+    objects for each one costs far more than the insert itself.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"created_at": now, "match_id": match_id, "seats_available": seats, "sections_blob": blob}
+        for match_id, seats, blob in observations
+    ]
+    if rows:
+        session.execute(insert(Observation), rows)
+    return len(rows)
+
+
+def iter_section_snapshots(
+    session: Session,
+    match_ids: Optional[Iterable[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[Tuple[datetime, str, bytes]]:
+    """Stream ``(created_at, match_id, sections_blob)`` for observations that carry sections."""
+    stmt = (
+        select(Observation.created_at, Observation.match_id, Observation.sections_blob)
+        .where(Observation.sections_blob.is_not(None))
+        .order_by(Observation.match_id, Observation.created_at)
+    )
+    if match_ids is not None:
+        stmt = stmt.where(Observation.match_id.in_(list(match_ids)))
+    if since is not None:
+        stmt = stmt.where(Observation.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Observation.created_at < until)
+    for created_at, match_id, blob in session.execute(stmt.execution_options(yield_per=10_000)):
+        yield created_at, match_id, blob
+
+
 def record_notification(
     session: Session,
     match_id: str,
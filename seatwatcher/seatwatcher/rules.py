@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Pattern, Tuple
+
+
+# Rule kinds; the integer codes index the evaluator's columnar rule table
+THRESHOLD = 0
+RISE = 1
+DROP_TO_ZERO = 2
+CROSS_ABOVE = 3
+SUSTAINED = 4
+
+KIND_NAMES = {
+    THRESHOLD: "threshold",
+    RISE: "rise",
+    DROP_TO_ZERO: "drop_to_zero",
+    CROSS_ABOVE: "cross_above",
+    SUSTAINED: "sustained",
+}
+
+_UNITS = {"": 1.0, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A compiled alert rule.
+
+    ``value`` is the seat count the rule compares against (the increase for ``rise``)
+    and ``seconds`` how long a ``sustained`` condition must hold.
+    """
+
+    kind: int
+    value: int = 0
+    seconds: float = 0.0
+    text: str = ""
+
+    @property
+    def kind_name(self) -> str:
+        return KIND_NAMES[self.kind]
+
+
+def _duration(amount: str, unit: str) -> float:
+    return float(amount) * _UNITS[unit.lower()]
+
+
+_GRAMMAR: List[Tuple[Pattern[str], Callable[[re.Match[str]], Tuple[int, int, float]]]] = [
+    (
+        re.compile(r"seats\s*>=\s*(\d+)\s+for\s+(\d+(?:\.\d+)?)\s*([smh]?)", re.IGNORECASE),
+        lambda m: (SUSTAINED, int(m.group(1)), _duration(m.group(2), m.group(3))),
+    ),
+    (re.compile(r"seats\s*>=\s*(\d+)", re.IGNORECASE), lambda m: (THRESHOLD, int(m.group(1)), 0.0)),
+    (re.compile(r"rises?\s*(?:>=|by)\s*(\d+)", re.IGNORECASE), lambda m: (RISE, int(m.group(1)), 0.0)),
+    (re.compile(r"drops?\s+to\s+zero", re.IGNORECASE), lambda m: (DROP_TO_ZERO, 0, 0.0)),
+    (re.compile(r"cross(?:es)?\s+above\s+(\d+)", re.IGNORECASE), lambda m: (CROSS_ABOVE, int(m.group(1)), 0.0)),
+]
+
+SYNTAX_HELP = (
+    "'seats >= N', 'seats >= N for T[s|m|h]', 'rise >= N', 'drop to zero' or 'cross above N'"
+)
+
+
+def parse_rule(text: str) -> Rule:
+    """
+    Compile one rule expression.
+
+    ``seats >= N``           seats currently at least N (level-triggered)
+    ``seats >= N for 90s``   ... continuously for at least that long
+    ``rise >= N``            up by at least N since the previous observation
+    ``drop to zero``         went from some seats to none
+    ``cross above N``        went from below N to at least N (edge-triggered)
+    """
+    source = " ".join(text.split())
+    for pattern, build in _GRAMMAR:
+        match = pattern.fullmatch(source)
+        if match is not None:
+            kind, value, seconds = build(match)
+            return Rule(kind=kind, value=value, seconds=seconds, text=source)
+    raise ValueError(f"Invalid rule {text!r}; expected {SYNTAX_HELP}")
+
+
+def threshold_rule(seat_threshold_min: int) -> Rule:
+    return Rule(kind=THRESHOLD, value=seat_threshold_min, text=f"seats >= {seat_threshold_min}")
+
+
+def describe(rules: List[Rule]) -> Dict[str, int]:
+    """Rule counts by kind, for metrics."""
+    counts: Dict[str, int] = {}
+    for rule in rules:
+        counts[rule.kind_name] = counts.get(rule.kind_name, 0) + 1
+    return counts
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .db import get_engine
+from .logging_utils import get_logger
+from .utils.httpserver import Request, Response, start_http_server
+
+
+logger = get_logger(__name__)
+
+
+# Resource series checked for sustained growth, with the unit used in reports
+METRICS = {
+    "rss_bytes": "bytes",
+    "traced_bytes": "bytes",
+    "fds": "count",
+    "sockets": "count",
+    "tasks": "count",
+    "pool_checkouts": "count",
+}
+
+
+@dataclass
+class SoakLimits:
+    """Largest tolerated growth per metric between the start and end of the run."""
+
+    rss_bytes: float = 64 * 1024 * 1024
+    traced_bytes: float = 32 * 1024 * 1024
+    fds: float = 16
+    sockets: float = 16
+    tasks: float = 32
+    pool_checkouts: float = 2
+
+
+@dataclass
+class ResourceSample:
+    elapsed_seconds: float
+    rss_bytes: Optional[int]
+    traced_bytes: int
+    fds: Optional[int]
+    sockets: Optional[int]
+    tasks: int
+    pool_checkouts: Optional[int]
+
+
+@dataclass
+class SoakReport:
+    duration_seconds: float
+    observations: int
+    samples: List[ResourceSample] = field(default_factory=list)
+    growth: Dict[str, float] = field(default_factory=dict)
+    failures: List[str] = field(default_factory=list)
+    top_growth: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> Dict[str, Any]:
+        doc = asdict(self)
+        doc["ok"] = self.ok
+        return doc
+
+
+def _open_fds() -> tuple[Optional[int], Optional[int]]:
+    """(file descriptors, of which sockets); ``None`` where /proc is unavailable."""
+    try:
+        entries = os.listdir("/proc/self/fd")
+    except OSError:
+        return None, None
+    sockets = 0
+    for entry in entries:
+        try:
+            if os.readlink(f"/proc/self/fd/{entry}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            # The fd used by listdir itself is already closed
+            continue
+    return len(entries), sockets
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _pool_checkouts() -> Optional[int]:
+    checkedout = getattr(get_engine().pool, "checkedout", None)
+    return checkedout() if checkedout is not None else None
+
+
+def sample_resources(started: float) -> ResourceSample:
+    fds, sockets = _open_fds()
+    return ResourceSample(
+        elapsed_seconds=round(time.monotonic() - started, 3),
+        rss_bytes=_rss_bytes(),
+        traced_bytes=tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+        fds=fds,
+        sockets=sockets,
+        tasks=len(asyncio.all_tasks()),
+        pool_checkouts=_pool_checkouts(),
+    )
+
+
+def sustained_growth(values: List[float]) -> tuple[float, bool]:
+    """
+    Growth from the first to the last third of a series, and whether it is still rising.
+
+    Medians of each third smooth out GC and allocator noise; a series counts as
+    "still growing" only if the middle third sits above the first and the last above
+    the middle, so a one-off step (a cache filling up) does not fail the run.
+    """
+    if len(values) < 6:
+        return 0.0, False
+    third = len(values) // 3
+    first = statistics.median(values[:third])
+    middle = statistics.median(values[third:-third])
+    last = statistics.median(values[-third:])
+    return last - first, first <= middle < last
+
+
+def soak_config(
+    base: Config,
+    monitors: int,
+    provider_url: Optional[str] = None,
+    scenario_file: Optional[str] = None,
+    min_seats: int = 0,
+    max_seats: int = 10,
+) -> Config:
+    """
+    Derive a synthetic workload from ``base``: its app/database settings with
+    ``monitors`` generated monitors on one console channel.
+
+    Monitors use a mix of rules so alerts, notification dedup and the rule engine are
+    exercised, not just observation writes.
+    """
+    if scenario_file is not None:
+        provider: Dict[str, Any] = {"type": "simulation", "simulation": {"scenario_file": scenario_file}}
+    elif provider_url is None:
+        provider = {"type": "dummy", "dummy": {"seed": 7, "min_seats": min_seats, "max_seats": max_seats}}
+    else:
+        provider = {
+            "type": "http_json",
+            "http_json": {"url_template": f"{provider_url}/matches/$match_id", "jmespath": "seats", "timeout_seconds": 5},
+        }
+    return Config(
+        app=base.app.model_dump(),
+        database=base.database.model_dump(),
+        providers={"soak": provider},
+        notifiers={"soak": {"type": "console"}},
+        monitors=[
+            {
+                "name": f"soak-{i}",
+                "match_id": f"SOAK-{i}",
+                "poll_interval_seconds": 1,
+                "channels": ["soak"],
+                "min_notify_interval_seconds": 60,
+                "rules": [f"seats >= {max_seats}", f"cross above {max_seats - 2}", "drop to zero"],
+            }
+            for i in range(monitors)
+        ],
+    )
+
+
+async def start_fake_provider(host: str = "127.0.0.1", port: int = 0, seed: int = 7) -> tuple[asyncio.AbstractServer, str]:
+    """Serve ``GET /matches/<id>`` -> ``{"seats": n}`` locally; returns the server and its base URL."""
+    rng = random.Random(seed)
+
+    async def _handle(request: Request) -> Response:
+        if not request.path.startswith("/matches/"):
+            return Response.json(404, {"error": "not found"})
+        return Response.json(200, {"seats": rng.randint(0, 10)})
+
+    server = await start_http_server(_handle, host=host, port=port)
+    bound_port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}"
+
+
+async def run_soak(
+    base: Config,
+    duration_seconds: float,
+    monitors: int = 100,
+    fake_http: bool = False,
+    scenario_file: Optional[str] = None,
+    poll_interval_scale: float = 0.1,
+    sample_every_seconds: float = 30.0,
+    warmup_seconds: float = 60.0,
+    snapshot_every: int = 10,
+    top: int = 10,
+    limits: Optional[SoakLimits] = None,
+    on_sample: Optional[Callable[[ResourceSample], None]] = None,
+) -> SoakReport:
+    """
+    Run ``WatcherService`` on a synthetic workload and watch for resource growth.
+
+    Samples are taken every ``sample_every_seconds``; those from the first
+    ``warmup_seconds`` (pools filling, imports, caches) are reported but excluded from
+    the growth check. A ``tracemalloc`` snapshot is taken at the end of warmup and
+    every ``snapshot_every`` samples, and compared against it to name the top growing
+    allocation sites.
+
+    Why: RSS creep in long-lived containers only shows up after hours; running the
+    real service at accelerated poll rates with leak-relevant counters makes it
+    reproducible on a laptop and in CI.
+    """
+    from .models import Base
+    from .watcher import WatcherService
+
+    limits = limits or SoakLimits()
+    await asyncio.to_thread(Base.metadata.create_all, get_engine())
+    server = None
+    url = None
+    if fake_http:
+        server, url = await start_fake_provider()
+    cfg = soak_config(base, monitors, provider_url=url, scenario_file=scenario_file)
+
+    tracemalloc.start()
+    started = time.monotonic()
+    service = WatcherService(cfg, poll_interval_scale=poll_interval_scale)
+    task = asyncio.create_task(service.run())
+    report = SoakReport(duration_seconds=duration_seconds, observations=0)
+    baseline: Optional[tracemalloc.Snapshot] = None
+    measured: List[ResourceSample] = []
+    try:
+        while time.monotonic() - started < duration_seconds:
+            await asyncio.sleep(min(sample_every_seconds, max(0.0, duration_seconds - (time.monotonic() - started))))
+            if task.done():
+                # Surface the crash instead of reporting a quiet, idle process
+                task.result()
+            sample = sample_resources(started)
+            report.samples.append(sample)
+            if on_sample is not None:
+                on_sample(sample)
+            if sample.elapsed_seconds < warmup_seconds:
+                continue
+            measured.append(sample)
+            if baseline is None:
+                baseline = tracemalloc.take_snapshot()
+            elif len(measured) % snapshot_every == 0:
+                report.top_growth = _top_growth(baseline, top)
+                for line in report.top_growth[:3]:
+                    logger.info("Soak top growth: %s", line)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if server is not None:
+            server.close()
+        if baseline is not None:
+            report.top_growth = _top_growth(baseline, top)
+        tracemalloc.stop()
+
+    report.observations = service.metrics.snapshot()["rules"]["observations_evaluated"]
+    for name in METRICS:
+        values = [getattr(s, name) for s in measured if getattr(s, name) is not None]
+        growth, growing = sustained_growth(values)
+        report.growth[name] = growth
+        limit = getattr(limits, name)
+        if growing and growth > limit:
+            report.failures.append(f"{name} grew by {growth:,.0f} (limit {limit:,.0f}) and was still rising")
+    if len(measured) < 6:
+        report.failures.append(
+            f"only {len(measured)} samples after warmup; lengthen --duration or sample more often"
+        )
+    return report
+
+
+def _top_growth(baseline: tracemalloc.Snapshot, top: int) -> List[str]:
+    ignore = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]
+    snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+    stats = snapshot.compare_to(baseline.filter_traces(ignore), "lineno")
+    return [str(stat) for stat in stats[:top] if stat.size_diff > 0]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from ..logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    # Header names are lower-cased
+    headers: Dict[str, str]
+    body: bytes
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json"
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> "Response":
+        return cls(status=status, body=json.dumps(payload).encode("utf-8"), headers=headers or {})
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+async def start_http_server(
+    handler: Handler,
+    host: str,
+    port: int,
+    max_body_bytes: int = 1_048_576,
+    idle_timeout_seconds: float = 30.0,
+) -> asyncio.AbstractServer:
+    """
+    Serve a minimal HTTP/1.1 endpoint on the running event loop.
+
+    Why: The watcher only needs to accept small JSON requests, so a few dozen lines on
+    top of asyncio streams avoid pulling a web framework into the runtime image. Only
+    Content-Length bodies are supported; keep-alive is honoured so busy senders can
+    reuse connections. ``idle_timeout_seconds`` bounds both the wait for the next
+    request line and the time to receive that request's headers and body.
+    """
+
+    async def _on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), idle_timeout_seconds)
+                except asyncio.TimeoutError:
+                    return
+                if not request_line:
+                    return
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await _write(writer, Response.json(400, {"error": "malformed request line"}), keep_alive=False)
+                    return
+                # Headers and body share one deadline, so a client trickling bytes in
+                # cannot hold the connection open indefinitely
+                deadline = asyncio.get_running_loop().time() + idle_timeout_seconds
+                try:
+                    headers = await asyncio.wait_for(_read_headers(reader), _remaining(deadline))
+                except asyncio.TimeoutError:
+                    return
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    await _write(writer, Response.json(411, {"error": "Content-Length required"}), keep_alive=False)
+                    return
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    await _write(writer, Response.json(400, {"error": "invalid Content-Length"}), keep_alive=False)
+                    return
+                if length > max_body_bytes:
+                    await _write(writer, Response.json(413, {"error": "body too large"}), keep_alive=False)
+                    return
+                try:
+                    body = await asyncio.wait_for(reader.readexactly(length), _remaining(deadline)) if length else b""
+                except asyncio.TimeoutError:
+                    return
+
+                parts = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                request = Request(method=method.upper(), path=parts.path, query=query, headers=headers, body=body)
+                try:
+                    response = await handler(request)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("HTTP handler failed for %s %s: %s", method, parts.path, exc)
+                    response = Response.json(500, {"error": "internal error"})
+                await _write(writer, response, keep_alive=keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_on_connection, host=host, port=port)
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - asyncio.get_running_loop().time())
+
+
+async def _write(writer: asyncio.StreamWriter, response: Response, keep_alive: bool) -> None:
+    reason = HTTPStatus(response.status).phrase
+    head = [
+        f"HTTP/1.1 {response.status} {reason}",
+        f"Content-Type: {response.content_type}",
+        f"Content-Length: {len(response.body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    head.extend(f"{k}: {v}" for k, v in response.headers.items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+    await writer.drain()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import re
+import struct
+import sys
+import zlib
+from array import array
+from fnmatch import translate
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# First byte of every blob: layout version and whether the payload is compressed
+_RAW_V1 = 1
+_ZLIB_V1 = 2
+_HEADER = struct.Struct("<II")  # section count, byte length of the names block
+
+SectionMatcher = Callable[[str], bool]
+
+
+def encode_sections(sections: Mapping[str, int]) -> bytes:
+    """
+    Pack a section -> seats snapshot into a compact blob.
+
+    Layout: a version byte, then (optionally zlib-compressed) section count and
+    names-block length, NUL-separated UTF-8 names sorted by name, and one
+    little-endian int32 per section. Names repeat across polls of a venue, so
+    they compress well; a 60-section venue is typically 150-300 bytes.
+
+    Why: One row per section per poll would multiply the observations table by the
+    number of sections; one blob per poll keeps the row count unchanged.
+    """
+    names = sorted(sections)
+    names_block = "\x00".join(names).encode("utf-8")
+    counts = array("i", (int(sections[name]) for name in names))
+    if sys.byteorder == "big":
+        counts.byteswap()
+    payload = _HEADER.pack(len(names), len(names_block)) + names_block + counts.tobytes()
+    compressed = zlib.compress(payload, 6)
+    if len(compressed) < len(payload):
+        return bytes([_ZLIB_V1]) + compressed
+    return bytes([_RAW_V1]) + payload
+
+
+def decode_sections(blob: bytes) -> Dict[str, int]:
+    names, counts = _unpack(blob)
+    return dict(zip(names, counts.tolist()))
+
+
+def _unpack(blob: bytes) -> Tuple[List[str], array]:
+    if not blob:
+        raise ValueError("empty sections blob")
+    version, payload = blob[0], blob[1:]
+    if version not in (_RAW_V1, _ZLIB_V1):
+        raise ValueError(f"unsupported sections blob version {version}")
+    # Truncated or garbled blobs surface as ValueError like every other bad blob
+    try:
+        if version == _ZLIB_V1:
+            payload = zlib.decompress(payload)
+        count, names_len = _HEADER.unpack_from(payload)
+    except (zlib.error, struct.error) as exc:
+        raise ValueError(f"corrupt sections blob: {exc}") from exc
+    offset = _HEADER.size
+    names_block = payload[offset : offset + names_len].decode("utf-8")
+    names = names_block.split("\x00") if count else []
+    counts_block = payload[offset + names_len : offset + names_len + 4 * count]
+    if len(counts_block) != 4 * count:
+        raise ValueError("corrupt sections blob")
+    counts = array("i")
+    counts.frombytes(counts_block)
+    if sys.byteorder == "big":
+        counts.byteswap()
+    if len(names) != count or len(counts) != count:
+        raise ValueError("corrupt sections blob")
+    return names, counts
+
+
+def section_matrix(blobs: Iterable[Optional[bytes]]) -> Tuple[List[str], np.ndarray]:
+    """
+    Decode many snapshots into a dense ``(snapshots, sections)`` int32 matrix.
+
+    Columns are the union of section names (sorted); sections missing from a
+    snapshot are 0. Rows without a blob are all zeros.
+    """
+    decoded = [_unpack(blob) if blob else ([], array("i")) for blob in blobs]
+    columns = sorted({name for names, _ in decoded for name in names})
+    index = {name: i for i, name in enumerate(columns)}
+    matrix = np.zeros((len(decoded), len(columns)), dtype=np.int32)
+    for row, (names, counts) in enumerate(decoded):
+        if names:
+            matrix[row, [index[name] for name in names]] = np.frombuffer(counts, dtype=np.int32)
+    return columns, matrix
+
+
+def section_matcher(patterns: Sequence[str]) -> Optional[SectionMatcher]:
+    """Compile glob patterns (e.g. ``"North*"``) into one matcher; ``None`` matches everything."""
+    if not patterns:
+        return None
+    regex = re.compile("|".join(f"(?:{translate(p)})" for p in patterns))
+    return lambda name: regex.match(name) is not None
+
+
+def aggregate_sections(sections: Mapping[str, int], matcher: Optional[SectionMatcher] = None, how: str = "sum") -> int:
+    """
+    Reduce the selected sections to one number.
+
+    ``sum`` counts seats across them, ``max`` is the best single section (useful
+    when a group must sit together) and ``nonempty`` counts sections with seats.
+    """
+    values = [seats for name, seats in sections.items() if matcher is None or matcher(name)]
+    if how == "sum":
+        return sum(values)
+    if how == "max":
+        return max(values, default=0)
+    if how == "nonempty":
+        return sum(1 for seats in values if seats > 0)
+    raise ValueError(f"unknown section aggregate: {how}")
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import time
 from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
 
 from .config import Config, MonitorConfig
 from .db import session_scope
-from .factory import build_notifier, build_provider
-from .logging_utils import get_logger
-from .repository import last_notification_within, record_notification, record_observation
+from .evaluator import RuleEngine
+from .factory import build_notifier, build_providers
+from .history import ObservationHistory
+from .logging_utils import get_logger, log_stats
+from .metrics import MetricsRegistry, start_metrics_server
+from .notifiers.base import CompositeNotifier, Notifier
+from .providers.base import SeatProvider, StreamingSeatProvider, check_seats, provides_sections
+from .providers.bounded import ProviderTimeoutError
+from .providers.resilience import CircuitBreaker, CircuitOpenError
+from .repository import last_notification_within, record_notification, record_observations
+from .rules import Rule
+from .utils.sections import SectionMatcher, aggregate_sections, encode_sections, section_matcher
 
 
 logger = get_logger(__name__)
@@ -16,69 +30,341 @@ logger = get_logger(__name__)
 @dataclass
 class MonitorRuntime:
     config: MonitorConfig
+    notifier: CompositeNotifier
+    provider_name: str
+    provider: SeatProvider
+    # Position in the rule engine's per-monitor state
+    index: int
+    # Compiled `sections` patterns; None watches the whole venue
+    sections: Optional[SectionMatcher] = None
+
+    @property
+    def log_extra(self) -> Dict[str, str]:
+        # Structured fields for JSON logs
+        return {"monitor": self.config.name, "match_id": self.config.match_id}
+
+    def seats_in(self, sections: Dict[str, int]) -> int:
+        """The number this monitor's rules evaluate for a section snapshot."""
+        return aggregate_sections(sections, self.sections, self.config.section_aggregate)
+
+
+class Observed(NamedTuple):
+    runtime: MonitorRuntime
+    # What the monitor's rules see: its selected sections, or the whole venue
+    seats: int
+    # Whole-venue seats, stored as seats_available
+    total: int
+    sections_blob: Optional[bytes] = None
 
 
 class WatcherService:
-    def __init__(self, cfg: Config) -> None:
+    def __init__(self, cfg: Config, poll_interval_scale: float = 1.0) -> None:
         self._cfg = cfg
-        self._provider = build_provider(cfg)
+        # Multiplies every monitor's poll interval; < 1 speeds up soak runs
+        self._poll_interval_scale = poll_interval_scale
+        # Circuit breakers keyed by upstream host (shared by every provider using it),
+        # or by provider name for in-process providers
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # Named providers, each with its own connection pool and concurrency cap
+        self._providers = build_providers(cfg, self._breakers)
+        # One instance per configured notifier, shared by all monitors
+        self._notifiers: Dict[str, Notifier] = {}
+        self._runtimes = [
+            MonitorRuntime(
+                config=monitor,
+                notifier=build_notifier(cfg, monitor.channels, self._notifiers),
+                provider_name=cfg.provider_name(monitor),
+                provider=self._providers[cfg.provider_name(monitor)],
+                index=index,
+                sections=section_matcher(monitor.sections),
+            )
+            for index, monitor in enumerate(cfg.monitors)
+        ]
+        for runtime in self._runtimes:
+            if runtime.config.sections and not provides_sections(runtime.provider):
+                raise ValueError(
+                    f"Monitor '{runtime.config.name}' filters sections but provider "
+                    f"'{runtime.provider_name}' does not report them"
+                )
+        self._rules = RuleEngine([monitor.compiled_rules for monitor in cfg.monitors])
+        # Polled monitors hand observations to a single evaluator task so every
+        # monitor due at the same time is recorded and evaluated in one batch.
+        # Bounded: if the evaluator falls a full round behind, pollers wait to
+        # enqueue instead of piling up observations
+        self._pending: asyncio.Queue[Observed] = asyncio.Queue(maxsize=max(1, len(self._runtimes)))
+        # In-flight notification per monitor index; sends never block the evaluator
+        self._notifying: Dict[int, asyncio.Task[None]] = {}
+        # Recent samples per match for trend queries and live debugging
+        self.history = ObservationHistory(capacity=cfg.app.history.capacity)
+        self.metrics = MetricsRegistry()
+        self.metrics.register("monitors", lambda: len(self._runtimes))
+        self.metrics.register("history", self.history.stats)
+        self.metrics.register_debug("history", self._debug_history)
+        self.metrics.register("circuits", lambda: {host: b.stats() for host, b in self._breakers.items()})
+        self.metrics.register("providers", self._provider_stats)
+        self.metrics.register("rules", self._rules.stats)
+        self.metrics.register(
+            "pipeline",
+            lambda: {"pending_observations": self._pending.qsize(), "notifications_in_flight": len(self._notifying)},
+        )
+        self.metrics.register("logging", log_stats)
 
     async def run(self) -> None:
-        tasks = [self._run_monitor(monitor) for monitor in self._cfg.monitors]
-        await asyncio.gather(*tasks)
+        metrics_cfg = self._cfg.app.metrics
+        server = None
+        if metrics_cfg.enabled:
+            server = await start_metrics_server(self.metrics, metrics_cfg.host, metrics_cfg.port)
+        tasks = []
+        for name, provider in self._providers.items():
+            runtimes = [runtime for runtime in self._runtimes if runtime.provider_name == name]
+            if isinstance(provider, StreamingSeatProvider):
+                tasks.append(self._run_stream(provider, runtimes))
+            else:
+                tasks.extend(self._run_monitor(runtime) for runtime in runtimes)
+        if any(not isinstance(provider, StreamingSeatProvider) for provider in self._providers.values()):
+            tasks.append(self._run_evaluator())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if server is not None:
+                server.close()
+            await self._close_providers()
+            # Flushing digests completes the sends still waiting on them
+            await asyncio.gather(self._close_notifiers(), *self._notifying.values(), return_exceptions=True)
+
+    def _provider_stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = {}
+        for name, provider in self._providers.items():
+            source = getattr(provider, "stats", None)
+            stats[name] = source() if source is not None else {}
+        return stats
+
+    def _debug_history(self, query: Dict[str, str]) -> Dict[str, object]:
+        match_id = query.get("match_id")
+        if not match_id:
+            raise ValueError("match_id is required")
+        if match_id not in self.history:
+            raise LookupError(f"no history for match_id={match_id}")
+        window = float(query.get("window", "300"))
+        threshold = int(query["threshold"]) if "threshold" in query else None
+        doc = self.history.summary(match_id, window_seconds=window, threshold=threshold)
+        if query.get("samples"):
+            doc["recent"] = self.history.samples(match_id, window)
+        return doc
 
-    async def _run_monitor(self, monitor: MonitorConfig) -> None:
-        notifier = build_notifier(self._cfg, monitor.channels)
+    async def _close_providers(self) -> None:
+        for name, provider in self._providers.items():
+            close = getattr(provider, "aclose", None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Error closing provider '%s': %s", name, exc)
+
+    async def _close_notifiers(self) -> None:
+        # Flush digests so alerts buffered at shutdown are not lost
+        await CompositeNotifier(list(self._notifiers.values())).aclose()
+
+    async def _run_monitor(self, runtime: MonitorRuntime) -> None:
+        monitor = runtime.config
         poll_interval = max(1, int(monitor.poll_interval_seconds))
         logger.info(
-            "Starting monitor '%s' for match_id=%s interval=%ss channels=%s",
+            "Starting monitor '%s' for match_id=%s provider=%s interval=%ss channels=%s",
             monitor.name,
             monitor.match_id,
+            runtime.provider_name,
             poll_interval,
-            ",".join(notifier.channels()),
+            ",".join(runtime.notifier.channels()),
+            extra=runtime.log_extra,
         )
+        # Providers that report sections are always asked for them so every poll's
+        # breakdown is stored, even for monitors watching the whole venue
+        by_section = provides_sections(runtime.provider)
         while True:
             try:
-                seats = await self._provider.fetch_available_seats(monitor.match_id)
-                logger.debug("Observed %s seats for %s", seats, monitor.match_id)
-                with session_scope() as session:
-                    record_observation(session, monitor.match_id, seats)
-
-                    if seats >= monitor.seat_threshold_min:
-                        should_skip = False
-                        for channel in notifier.channels():
-                            existing = last_notification_within(
-                                session,
-                                monitor.match_id,
-                                channel,
-                                monitor.min_notify_interval_seconds,
-                            )
-                            if existing:
-                                should_skip = True
-                                logger.debug(
-                                    "Skipping notify for %s on %s: last at %s",
-                                    monitor.match_id,
-                                    channel,
-                                    existing.created_at,
-                                )
-                        if not should_skip:
-                            subject = f"Seats available for {monitor.match_id}: {seats}"
-                            body = (
-                                f"Monitor: {monitor.name}\n"
-                                f"Match: {monitor.match_id}\n"
-                                f"Seats available: {seats}\n"
-                            )
-                            await notifier.send_all(subject=subject, message=body)
-                            for ch in notifier.channels():
-                                record_notification(
-                                    session,
-                                    match_id=monitor.match_id,
-                                    channel=ch,
-                                    subject=subject,
-                                    message=body,
-                                    seats_available=seats,
-                                )
+                if by_section:
+                    snapshot = await runtime.provider.fetch_sections(monitor.match_id)  # type: ignore[attr-defined]
+                    observed = Observed(
+                        runtime,
+                        runtime.seats_in(snapshot.sections),
+                        snapshot.total,
+                        encode_sections(snapshot.sections),
+                    )
+                else:
+                    seats = await runtime.provider.fetch_available_seats(monitor.match_id)
+                    observed = Observed(runtime, seats, seats)
+                self.history.append(monitor.match_id, check_seats(observed.total))
+                await self._pending.put(observed)
+            except CircuitOpenError as exc:
+                # Expected while an upstream is degraded; the transition itself is logged
+                logger.debug("Skipping tick for '%s': %s", monitor.name, exc, extra=runtime.log_extra)
+            except ProviderTimeoutError as exc:
+                logger.warning(
+                    "Monitor '%s' (provider %s): %s", monitor.name, runtime.provider_name, exc, extra=runtime.log_extra
+                )
             except Exception as exc:  # noqa: BLE001
-                logger.exception("Error in monitor '%s': %s", monitor.name, exc)
+                logger.exception("Error in monitor '%s': %s", monitor.name, exc, extra=runtime.log_extra)
+
+            await asyncio.sleep(poll_interval * self._poll_interval_scale)
+
+    async def _run_evaluator(self) -> None:
+        while True:
+            batch = [await self._pending.get()]
+            # Take everything that arrived while the previous batch was being handled
+            while not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            try:
+                await self._handle_observations(batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Error handling batch of %d observations: %s", len(batch), exc)
+
+    async def _run_stream(self, provider: StreamingSeatProvider, runtimes: List[MonitorRuntime]) -> None:
+        """
+        Consume a push provider and route each update to every monitor on that match.
+
+        Why: A single subscription multiplexes all match_ids, so there is one consumer
+        loop instead of one polling coroutine per monitor.
+        """
+        by_match: Dict[str, List[MonitorRuntime]] = {}
+        for runtime in runtimes:
+            by_match.setdefault(runtime.config.match_id, []).append(runtime)
+            logger.info(
+                "Subscribing monitor '%s' for match_id=%s channels=%s",
+                runtime.config.name,
+                runtime.config.match_id,
+                ",".join(runtime.notifier.channels()),
+                extra=runtime.log_extra,
+            )
+        async for batch in provider.stream(list(by_match)):
+            observations: List[Observed] = []
+            for match_id, seats in batch:
+                runtimes = by_match.get(match_id)
+                if not runtimes:
+                    logger.debug("Ignoring update for unmonitored match_id=%s", match_id)
+                    continue
+                # One bad push drops only its own update, never the stream
+                try:
+                    self.history.append(match_id, check_seats(seats))
+                except (TypeError, ValueError, OverflowError) as exc:
+                    logger.warning("Dropping update for match_id=%s: %s", match_id, exc)
+                    continue
+                observations.extend(Observed(runtime, seats, seats) for runtime in runtimes)
+            if not observations:
+                continue
+            try:
+                await self._handle_observations(observations)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Error handling batch of %d updates: %s", len(observations), exc)
+
+    async def _handle_observations(self, observations: List[Observed]) -> None:
+        """
+        Record a batch of observations and notify monitors whose rules fired.
+
+        Why: Every observation is persisted in one transaction and the whole batch is
+        evaluated in one pass of the rule engine; a monitor is notified at most once
+        per batch, for its latest firing observation. Notifications are sent from
+        per-monitor tasks, so a slow Slack or SMTP send never holds up recording and
+        evaluation for every other monitor.
+        """
+        # Skip the per-observation loop entirely unless DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            for obs in observations:
+                runtime = obs.runtime
+                logger.debug("Observed %s seats for %s", obs.seats, runtime.config.match_id, extra=runtime.log_extra)
+        rows = [(obs.runtime.config.match_id, obs.total, obs.sections_blob) for obs in observations]
+        # DB calls are blocking; run them on the default executor so the event loop
+        # keeps serving sockets and timers meanwhile
+        await asyncio.to_thread(self._record_observations, rows)
+
+        count = len(observations)
+        positions, rules = self._rules.evaluate(
+            np.fromiter((obs.runtime.index for obs in observations), dtype=np.int64, count=count),
+            np.fromiter((obs.seats for obs in observations), dtype=np.int64, count=count),
+            time.time(),
+        )
+        fired: Dict[int, Tuple[MonitorRuntime, int, Rule]] = {}
+        for position, rule in zip(positions.tolist(), rules.tolist()):
+            runtime, seats = observations[position][:2]
+            fired[runtime.index] = (runtime, seats, self._rules.rule(rule))
+        for runtime, seats, rule in fired.values():
+            self._notify_in_background(runtime, seats, rule)
+
+    def _notify_in_background(self, runtime: MonitorRuntime, seats: int, rule: Rule) -> None:
+        index = runtime.index
+        if index in self._notifying:
+            # Its notification_logs rows are written only once the send completes (for
+            # a digest, once the digest is delivered), so sending again now would
+            # bypass min_notify_interval_seconds
+            logger.debug("Notification for '%s' still in flight; skipping", runtime.config.name, extra=runtime.log_extra)
+            return
+        task = asyncio.create_task(self._notify_logged(runtime, seats, rule))
+        self._notifying[index] = task
+        task.add_done_callback(lambda _: self._notifying.pop(index, None))
+
+    async def _notify_logged(self, runtime: MonitorRuntime, seats: int, rule: Rule) -> None:
+        # Nobody awaits the task, so failures are logged here
+        try:
+            await self._maybe_notify(runtime, seats, rule)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Error in monitor '%s': %s", runtime.config.name, exc, extra=runtime.log_extra)
+
+    async def _maybe_notify(self, runtime: MonitorRuntime, seats: int, rule: Rule) -> None:
+        monitor = runtime.config
+        notifier = runtime.notifier
+        channels = notifier.channels()
+        if await asyncio.to_thread(self._recently_notified, monitor, channels):
+            return
+        subject = f"Seats available for {monitor.match_id}: {seats}"
+        body = (
+            f"Monitor: {monitor.name}\n"
+            f"Match: {monitor.match_id}\n"
+            f"Seats available: {seats}\n"
+            f"Rule: {rule.text}\n"
+        )
+        if monitor.sections:
+            body += f"Sections: {', '.join(monitor.sections)} ({monitor.section_aggregate})\n"
+        await notifier.send_all(subject=subject, message=body)
+        await asyncio.to_thread(self._record_notifications, monitor, channels, subject, body, seats)
+
+    @staticmethod
+    def _record_observations(rows: List[Tuple[str, int, Optional[bytes]]]) -> None:
+        with session_scope() as session:
+            record_observations(session, rows)
+
+    @staticmethod
+    def _recently_notified(monitor: MonitorConfig, channels: List[str]) -> bool:
+        should_skip = False
+        with session_scope() as session:
+            for channel in channels:
+                existing = last_notification_within(
+                    session,
+                    monitor.match_id,
+                    channel,
+                    monitor.min_notify_interval_seconds,
+                )
+                if existing:
+                    should_skip = True
+                    logger.debug(
+                        "Skipping notify for %s on %s: last at %s",
+                        monitor.match_id,
+                        channel,
+                        existing.created_at,
+                        extra={"monitor": monitor.name, "match_id": monitor.match_id, "channel": channel},
+                    )
+        return should_skip
 
-            await asyncio.sleep(poll_interval)
\ No newline at end of file
+    @staticmethod
+    def _record_notifications(
+        monitor: MonitorConfig, channels: List[str], subject: str, body: str, seats: int
+    ) -> None:
+        with session_scope() as session:
+            for ch in channels:
+                record_notification(
+                    session,
+                    match_id=monitor.match_id,
+                    channel=ch,
+                    subject=subject,
+                    message=body,
+                    seats_available=seats,
+                )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from seatwatcher.providers.base import SeatProvider
+from seatwatcher.providers.bounded import BoundedProvider, ProviderTimeoutError
+from seatwatcher.providers.resilience import CLOSED, OPEN, CircuitBreaker, ResilientProvider
+
+
+class _Sleepy(SeatProvider):
+    def __init__(self, delay: float, error: BaseException | None = None) -> None:
+        self._delay = delay
+        self._error = error
+        self.calls = 0
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+        return 7
+
+
+def test_inner_timeout_is_not_reported_as_an_expired_budget() -> None:
+    # Since 3.11 asyncio.TimeoutError is TimeoutError, so the two are easy to mix up
+    provider = BoundedProvider(_Sleepy(0.0, TimeoutError("upstream read timeout")), timeout_budget_seconds=1.0)
+
+    with pytest.raises(TimeoutError, match="upstream read timeout") as info:
+        asyncio.run(provider.fetch_available_seats("A"))
+
+    assert not isinstance(info.value, ProviderTimeoutError)
+    assert provider.stats()["budget_timeouts"] == 0
+
+
+def test_expired_budget_cancels_the_call() -> None:
+    provider = BoundedProvider(_Sleepy(5.0), max_concurrency=1, timeout_budget_seconds=0.05)
+
+    with pytest.raises(ProviderTimeoutError) as info:
+        asyncio.run(provider.fetch_available_seats("A"))
+
+    assert not info.value.queued
+    stats = provider.stats()
+    assert (stats["budget_timeouts"], stats["in_flight"], stats["waiting"]) == (1, 0, 0)
+
+
+def test_budget_spent_waiting_for_a_slot_is_marked_queued() -> None:
+    inner = _Sleepy(0.3)
+    provider = BoundedProvider(inner, max_concurrency=1, timeout_budget_seconds=0.5)
+
+    async def scenario() -> None:
+        holder = asyncio.create_task(provider.fetch_available_seats("A"))
+        await asyncio.sleep(0)
+        # Cap the second call's budget below the holder's remaining time
+        provider._timeout_budget_seconds = 0.05
+        with pytest.raises(ProviderTimeoutError) as info:
+            await provider.fetch_available_seats("B")
+        assert info.value.queued
+        assert await holder == 7
+
+    asyncio.run(scenario())
+    assert inner.calls == 1
+    assert provider.stats()["waiting"] == 0
+
+
+def test_slot_wait_timeouts_do_not_trip_the_breaker() -> None:
+    breaker = CircuitBreaker("upstream", window_size=2, min_calls=2, open_seconds=60)
+    bounded = BoundedProvider(_Sleepy(0.3), max_concurrency=1, timeout_budget_seconds=0.5)
+    provider = ResilientProvider(bounded, breaker=breaker)
+
+    async def scenario() -> None:
+        holder = asyncio.create_task(provider.fetch_available_seats("A"))
+        await asyncio.sleep(0)
+        bounded._timeout_budget_seconds = 0.02
+        for _ in range(3):
+            with pytest.raises(ProviderTimeoutError):
+                await provider.fetch_available_seats("B")
+        assert breaker.state == CLOSED
+        assert await holder == 7
+
+    asyncio.run(scenario())
+    assert breaker.stats()["window_calls"] == 1
+    assert breaker.stats()["error_rate"] == 0.0
+
+
+def test_timeouts_inside_the_upstream_call_do_trip_the_breaker() -> None:
+    breaker = CircuitBreaker("upstream", window_size=2, min_calls=2, open_seconds=60)
+    provider = ResilientProvider(BoundedProvider(_Sleepy(5.0), timeout_budget_seconds=0.02), breaker=breaker)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            with pytest.raises(ProviderTimeoutError):
+                await provider.fetch_available_seats("A")
+
+    asyncio.run(scenario())
+    assert breaker.state == OPEN
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+from click.testing import CliRunner
+
+from seatwatcher.cli import cli
+from seatwatcher.notifiers.base import Notifier
+from seatwatcher.notifiers.digest import DigestNotifier
+
+
+class _Recorder(Notifier):
+    def __init__(self, error: Optional[Exception] = None) -> None:
+        self.sent: List[Tuple[str, Optional[str]]] = []
+        self._error = error
+
+    def channel_name(self) -> str:
+        return "recorder"
+
+    async def send(self, subject: str, message: str | None = None) -> None:
+        await asyncio.sleep(0)
+        if self._error is not None:
+            raise self._error
+        self.sent.append((subject, message))
+
+
+def test_full_buffer_is_sent_without_waiting_for_the_window() -> None:
+    inner = _Recorder()
+    digest = DigestNotifier(inner, window_seconds=60, max_items=3)
+
+    async def scenario() -> None:
+        await asyncio.wait_for(asyncio.gather(*(digest.send(f"alert {i}", "body") for i in range(3))), timeout=1)
+
+    asyncio.run(scenario())
+    assert inner.sent == [("3 seat alerts", "alert 0\nbody\n\nalert 1\nbody\n\nalert 2\nbody")]
+
+
+def test_partial_buffer_is_sent_when_the_window_closes() -> None:
+    inner = _Recorder()
+    digest = DigestNotifier(inner, window_seconds=0.1, max_items=50)
+
+    async def scenario() -> float:
+        started = time.monotonic()
+        await asyncio.gather(digest.send("one"), digest.send("two"))
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed >= 0.1
+    assert inner.sent == [("2 seat alerts", "one\n\ntwo")]
+
+
+def test_single_alert_is_sent_as_is() -> None:
+    inner = _Recorder()
+    digest = DigestNotifier(inner, window_seconds=0.01, max_items=50)
+
+    asyncio.run(digest.send("only", "details"))
+    assert inner.sent == [("only", "details")]
+
+
+@pytest.mark.parametrize("max_items", [3, 50])
+def test_failed_delivery_reaches_every_waiting_sender(max_items: int) -> None:
+    error = RuntimeError("smtp down")
+    digest = DigestNotifier(_Recorder(error), window_seconds=0.05, max_items=max_items)
+
+    async def scenario() -> List[BaseException]:
+        return await asyncio.gather(*(digest.send(f"alert {i}") for i in range(3)), return_exceptions=True)
+
+    assert asyncio.run(scenario()) == [error, error, error]
+
+
+def test_aclose_delivers_buffered_alerts_and_releases_senders() -> None:
+    inner = _Recorder()
+    digest = DigestNotifier(inner, window_seconds=60, max_items=50)
+
+    async def scenario() -> None:
+        senders = [asyncio.create_task(digest.send(f"alert {i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        assert not inner.sent
+        await asyncio.wait_for(digest.aclose(), timeout=1)
+        await asyncio.wait_for(asyncio.gather(*senders), timeout=1)
+
+    asyncio.run(scenario())
+    assert inner.sent == [("2 seat alerts", "alert 0\n\nalert 1")]
+
+
+def test_aclose_waits_for_deliveries_already_in_flight() -> None:
+    inner = _Recorder()
+    digest = DigestNotifier(inner, window_seconds=60, max_items=1)
+
+    async def scenario() -> None:
+        sender = asyncio.create_task(digest.send("alert"))
+        await asyncio.sleep(0)
+        await digest.aclose()
+        assert inner.sent == [("alert", None)]
+        await sender
+
+    asyncio.run(scenario())
+
+
+def test_test_notify_does_not_wait_for_the_digest_window(tmp_path: Path) -> None:
+    config = tmp_path / "seatwatcher.yaml"
+    config.write_text(
+        f"""
+app:
+  log_level: "WARNING"
+database:
+  url: "sqlite:///{tmp_path / 'seatwatcher.db'}"
+provider:
+  type: "dummy"
+notifiers:
+  console:
+    type: "console"
+    digest:
+      window_seconds: 60
+monitors:
+  - name: "m"
+    match_id: "A"
+    channels: ["console"]
+""",
+        encoding="utf-8",
+    )
+
+    started = time.monotonic()
+    result = CliRunner().invoke(cli, ["--config", str(config), "test-notify", "--subject", "hi", "--body", "there"])
+
+    assert result.exit_code == 0, result.output
+    assert "Test notification sent" in result.output
+    assert time.monotonic() - started < 10
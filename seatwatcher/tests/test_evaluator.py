@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import List, Sequence, Set, Tuple
+
+import numpy as np
+
+from seatwatcher.evaluator import RuleEngine
+from seatwatcher.rules import CROSS_ABOVE, DROP_TO_ZERO, RISE, SUSTAINED, THRESHOLD, Rule, parse_rule
+
+
+def _reference(
+    rules_per_monitor: Sequence[Sequence[Rule]], batches: Sequence[Tuple[float, Sequence[Tuple[int, int]]]]
+) -> List[Set[Tuple[int, int, str]]]:
+    """Scalar rule evaluation, one observation at a time: (batch position, monitor, rule text) per firing."""
+    prev = [-1] * len(rules_per_monitor)
+    since = {}
+    fired = []
+    for now, observations in batches:
+        hits = set()
+        for pos, (monitor, seats) in enumerate(observations):
+            previous = prev[monitor]
+            for i, rule in enumerate(rules_per_monitor[monitor]):
+                if rule.kind == THRESHOLD:
+                    hit = seats >= rule.value
+                elif rule.kind == RISE:
+                    hit = previous >= 0 and seats - previous >= rule.value
+                elif rule.kind == DROP_TO_ZERO:
+                    hit = previous > 0 and seats == 0
+                elif rule.kind == CROSS_ABOVE:
+                    hit = previous >= 0 and previous < rule.value <= seats
+                else:
+                    assert rule.kind == SUSTAINED
+                    if seats >= rule.value:
+                        since.setdefault((monitor, i), now)
+                    else:
+                        since.pop((monitor, i), None)
+                    start = since.get((monitor, i), math.nan)
+                    hit = seats >= rule.value and now - start >= rule.seconds
+                if hit:
+                    hits.add((pos, monitor, rule.text))
+            prev[monitor] = seats
+        fired.append(hits)
+    return fired
+
+
+def _run_engine(
+    rules_per_monitor: Sequence[Sequence[Rule]], batches: Sequence[Tuple[float, Sequence[Tuple[int, int]]]]
+) -> List[Set[Tuple[int, int, str]]]:
+    engine = RuleEngine(rules_per_monitor)
+    fired = []
+    for now, observations in batches:
+        monitors = np.array([m for m, _ in observations], dtype=np.int64)
+        seats = np.array([s for _, s in observations], dtype=np.int64)
+        positions, rules = engine.evaluate(monitors, seats, now)
+        fired.append({(p, observations[p][0], engine.rule(r).text) for p, r in zip(positions.tolist(), rules.tolist())})
+    return fired
+
+
+def test_repeated_monitor_in_one_batch_sees_every_step() -> None:
+    rules = [[parse_rule("cross above 4"), parse_rule("drop to zero"), parse_rule("rise >= 3")], [parse_rule("seats >= 2")]]
+    # Monitor 0 goes 0 -> 5 -> 0 -> 3 within a single batch, interleaved with monitor 1
+    batch = [(0, 0), (1, 2), (0, 5), (0, 0), (1, 1), (0, 3)]
+    fired = _run_engine(rules, [(100.0, batch)])[0]
+    assert fired == {
+        (1, 1, "seats >= 2"),
+        (2, 0, "cross above 4"),
+        (2, 0, "rise >= 3"),
+        (3, 0, "drop to zero"),
+        (5, 0, "rise >= 3"),
+    }
+
+
+def test_batches_match_scalar_reference() -> None:
+    rng = random.Random(11)
+    texts = ["seats >= 3", "rise >= 2", "drop to zero", "cross above 4", "seats >= 2 for 20s"]
+    rules_per_monitor = [[parse_rule(t) for t in rng.sample(texts, rng.randint(1, 3))] for _ in range(25)]
+    batches = []
+    now = 0.0
+    for _ in range(200):
+        now += rng.choice([0.0, 5.0, 10.0])
+        # Small batches with frequent repeats exercise the multi-round path
+        observations = [(rng.randrange(25), rng.randint(0, 6)) for _ in range(rng.randint(1, 12))]
+        batches.append((now, observations))
+    assert _run_engine(rules_per_monitor, batches) == _reference(rules_per_monitor, batches)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Dict, List, Sequence
+
+import httpx
+import pytest
+
+from seatwatcher.config import Config
+from seatwatcher.history import ObservationHistory
+from seatwatcher.metrics import start_metrics_server
+from seatwatcher.providers.base import MAX_SEATS, SeatUpdate, StreamingSeatProvider
+from seatwatcher.watcher import Observed, WatcherService
+
+
+def _history(samples: Sequence[tuple], capacity: int = 8) -> ObservationHistory:
+    history = ObservationHistory(capacity=capacity)
+    for ts, seats in samples:
+        history.append("A", seats, ts=ts)
+    return history
+
+
+def test_ring_keeps_the_newest_samples_in_order() -> None:
+    history = _history([(float(t), t * 10) for t in range(7)], capacity=3)
+    history.append("B", 1, ts=100.0)
+
+    assert history.samples("A") == [(4.0, 40), (5.0, 50), (6.0, 60)]
+    assert history.latest("A") == (6.0, 60)
+    assert history.samples("B") == [(100.0, 1)]
+    assert history.samples("missing") == []
+    assert history.latest("missing") is None
+    assert len(history) == 2 and "A" in history
+
+
+def test_capacity_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        ObservationHistory(capacity=0)
+
+
+def test_samples_window_includes_the_cutoff() -> None:
+    history = _history([(0.0, 1), (10.0, 2), (20.0, 3), (30.0, 4)])
+
+    assert history.samples("A", window_seconds=10, now=30.0) == [(20.0, 3), (30.0, 4)]
+    assert history.samples("A", window_seconds=100, now=30.0) == history.samples("A")
+    assert history.samples("A", window_seconds=5, now=100.0) == []
+    assert history.min_max("A", window_seconds=20, now=30.0) == (2, 4)
+    assert history.min_max("A", window_seconds=5, now=100.0) is None
+
+
+def test_time_above_holds_each_value_until_the_next_sample() -> None:
+    history = _history([(0.0, 5), (10.0, 1), (20.0, 6)])
+
+    # Cutoff 5: 5 seats over [5, 10), 1 over [10, 20), 6 over [20, 30)
+    assert history.time_above("A", 5, window_seconds=25, now=30.0) == pytest.approx(15.0)
+    assert history.time_above("A", 6, window_seconds=25, now=30.0) == pytest.approx(10.0)
+    assert history.time_above("A", 7, window_seconds=25, now=30.0) == 0.0
+    assert history.time_above("missing", 0, window_seconds=25, now=30.0) == 0.0
+
+
+def test_rate_of_change_spans_the_window() -> None:
+    history = _history([(0.0, 100), (10.0, 90), (20.0, 40)])
+
+    assert history.rate_of_change("A", window_seconds=30, now=20.0) == pytest.approx(-3.0)
+    assert history.rate_of_change("A", window_seconds=10, now=20.0) == pytest.approx(-5.0)
+    assert history.rate_of_change("A", window_seconds=5, now=20.0) is None
+    assert _history([(1.0, 3), (1.0, 4)]).rate_of_change("A", window_seconds=10, now=1.0) is None
+
+
+def _config() -> Config:
+    return Config(
+        app={"log_level": "WARNING"},
+        database={"url": "sqlite://"},
+        provider={"type": "dummy"},
+        notifiers={"console": {"type": "console"}},
+        monitors=[{"name": "m", "match_id": "A", "channels": ["console"]}],
+    )
+
+
+def test_debug_history_endpoint_errors_and_summary() -> None:
+    service = WatcherService(_config())
+    service.history.append("A", 3)
+
+    async def scenario() -> Dict[str, httpx.Response]:
+        server = await start_metrics_server(service.metrics, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                return {
+                    "missing": await client.get("/debug/history"),
+                    "unknown": await client.get("/debug/history", params={"match_id": "Z"}),
+                    "ok": await client.get("/debug/history", params={"match_id": "A", "threshold": "2", "samples": "1"}),
+                }
+        finally:
+            server.close()
+
+    responses = asyncio.run(scenario())
+    assert responses["missing"].status_code == 400
+    assert "match_id" in responses["missing"].json()["error"]
+    assert responses["unknown"].status_code == 404
+    assert responses["ok"].status_code == 200
+    doc = responses["ok"].json()
+    assert (doc["samples"], doc["latest"]["seats"], doc["threshold"]) == (1, 3, 2)
+    assert [seats for _, seats in doc["recent"]] == [3]
+
+
+class _Pushes(StreamingSeatProvider):
+    def __init__(self, batches: List[List[SeatUpdate]]) -> None:
+        self._batches = batches
+
+    async def stream(self, match_ids: Sequence[str]) -> AsyncIterator[List[SeatUpdate]]:
+        for batch in self._batches:
+            yield batch
+
+
+def test_bad_stream_update_drops_only_itself() -> None:
+    service = WatcherService(_config())
+    handled: List[List[int]] = []
+
+    async def handle(observations: List[Observed]) -> None:
+        handled.append([obs.seats for obs in observations])
+
+    service._handle_observations = handle  # type: ignore[method-assign]
+    provider = _Pushes([[("A", 4), ("A", MAX_SEATS + 1)], [("A", -1)], [("A", MAX_SEATS)]])
+
+    asyncio.run(service._run_stream(provider, service._runtimes))
+
+    assert handled == [[4], [MAX_SEATS]]
+    assert [seats for _, seats in service.history.samples("A")] == [4, MAX_SEATS]
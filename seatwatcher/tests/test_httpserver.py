@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+from seatwatcher.utils.httpserver import Request, Response, start_http_server
+
+
+async def _echo(request: Request) -> Response:
+    return Response.json(200, {"bytes": len(request.body)})
+
+
+async def _open(server: asyncio.AbstractServer) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    port = server.sockets[0].getsockname()[1]
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+def test_slow_body_is_cut_off_after_the_idle_timeout() -> None:
+    async def scenario() -> None:
+        server = await start_http_server(_echo, host="127.0.0.1", port=0, idle_timeout_seconds=0.2)
+        try:
+            reader, writer = await _open(server)
+            writer.write(b"POST /x HTTP/1.1\r\nContent-Length: 10\r\n\r\nab")
+            await writer.drain()
+            # The remaining 8 bytes never come; the server must hang up on its own
+            assert await asyncio.wait_for(reader.read(), timeout=2) == b""
+            writer.close()
+        finally:
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_slow_headers_are_cut_off_after_the_idle_timeout() -> None:
+    async def scenario() -> None:
+        server = await start_http_server(_echo, host="127.0.0.1", port=0, idle_timeout_seconds=0.2)
+        try:
+            reader, writer = await _open(server)
+            writer.write(b"POST /x HTTP/1.1\r\nContent-Length: 2\r\n")
+            await writer.drain()
+            # Each header line arrives well within the timeout, but the whole set does not
+            closed = asyncio.ensure_future(reader.read())
+            for _ in range(10):
+                done, _ = await asyncio.wait({closed}, timeout=0.1)
+                if done:
+                    break
+                writer.write(b"X-Drip: 1\r\n")
+            assert await asyncio.wait_for(closed, timeout=2) == b""
+            writer.close()
+        finally:
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_complete_request_is_answered() -> None:
+    async def scenario() -> None:
+        server = await start_http_server(_echo, host="127.0.0.1", port=0, idle_timeout_seconds=0.2)
+        try:
+            reader, writer = await _open(server)
+            writer.write(b"POST /x HTTP/1.1\r\nConnection: close\r\nContent-Length: 3\r\n\r\nabc")
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), timeout=2)
+            writer.close()
+        finally:
+            server.close()
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert response.endswith(b'{"bytes": 3}')
+
+    asyncio.run(scenario())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import List
+
+import pytest
+
+from seatwatcher import logging_utils
+from seatwatcher.logging_utils import RateLimitFilter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 50.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    fake = _Clock()
+    monkeypatch.setattr(logging_utils, "time", fake)
+    return fake
+
+
+def _record(level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord("seatwatcher.test", level, __file__, 1, "msg", None, None)
+
+
+def _passed(limit: RateLimitFilter, count: int, level: int = logging.DEBUG) -> int:
+    return sum(1 for _ in range(count) if limit.filter(_record(level)))
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(clock: _Clock) -> None:
+    limit = RateLimitFilter(rate_per_second=2, burst=5)
+
+    assert _passed(limit, 10) == 5
+    clock.now += 1.0
+    assert _passed(limit, 10) == 2
+    clock.now += 0.25
+    assert _passed(limit, 10) == 0
+    clock.now += 0.25
+    assert _passed(limit, 10) == 1
+    assert limit.dropped == 5 + 8 + 10 + 9
+
+
+def test_token_bucket_refills_only_up_to_the_burst(clock: _Clock) -> None:
+    limit = RateLimitFilter(rate_per_second=10, burst=3)
+    assert _passed(limit, 3) == 3
+    clock.now += 3600
+    assert _passed(limit, 10) == 3
+
+
+def test_burst_defaults_to_one_second_of_rate(clock: _Clock) -> None:
+    limit = RateLimitFilter(rate_per_second=4)
+    assert _passed(limit, 10) == 4
+
+
+def test_records_above_max_level_are_never_limited(clock: _Clock) -> None:
+    limit = RateLimitFilter(rate_per_second=1, burst=1, sample_rate=0.000001, max_level="INFO")
+
+    assert _passed(limit, 100, logging.WARNING) == 100
+    assert _passed(limit, 100, logging.ERROR) == 100
+    assert limit.dropped == 0
+    assert _passed(limit, 100, logging.INFO) <= 1
+    assert limit.dropped >= 99
+
+
+def test_sampling_keeps_the_configured_fraction(monkeypatch: pytest.MonkeyPatch) -> None:
+    draws: List[float] = [0.1, 0.6, 0.4, 0.9, 0.0]
+
+    class _Random:
+        @staticmethod
+        def random() -> float:
+            return draws.pop(0)
+
+    monkeypatch.setattr(logging_utils, "random", _Random)
+    limit = RateLimitFilter(sample_rate=0.5)
+
+    assert [limit.filter(_record()) for _ in range(5)] == [True, False, True, False, True]
+    assert limit.dropped == 2
+
+
+def test_dropped_count_is_exact_across_threads() -> None:
+    limit = RateLimitFilter(sample_rate=0.5)
+    passed: List[int] = []
+
+    def worker() -> None:
+        passed.append(_passed(limit, 20_000))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Every record is either passed or counted as dropped, even under contention
+    assert sum(passed) + limit.dropped == 8 * 20_000
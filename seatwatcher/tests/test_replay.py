@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from seatwatcher.config import MonitorConfig
+from seatwatcher.replay import _build_columns, replay, simulate_alerts
+
+
+Row = Tuple[str, float, int]
+
+
+def _random_rows(rng: random.Random, matches: str, count: int) -> List[Row]:
+    # One observation per (match, second), as the watcher records them
+    rows = {(rng.choice(matches), float(rng.randint(0, 600))): rng.randint(0, 9) for _ in range(count)}
+    return [(m, t, s) for (m, t), s in rows.items()]
+
+
+def _reference(
+    rows: Sequence[Row],
+    monitors: Sequence[MonitorConfig],
+    channel_types: Optional[Mapping[str, str]] = None,
+) -> Tuple[int, Dict[str, int]]:
+    """The live watcher's dedup, one observation at a time: keyed by (match_id, notifier type)."""
+    types = channel_types or {}
+    last: Dict[Tuple[str, str], float] = {}
+    per_channel = {ch: 0 for m in monitors for ch in m.channels}
+    total = 0
+    for match_id, t, seats in sorted(rows):
+        for m in monitors:
+            if m.match_id != match_id or seats < m.seat_threshold_min:
+                continue
+            interval = m.min_notify_interval_seconds
+            keys = [types.get(ch, ch) for ch in m.channels]
+            if interval > 0 and any(last.get((match_id, key), float("-inf")) >= t - interval for key in keys):
+                continue
+            total += 1
+            for ch in m.channels:
+                per_channel[ch] += 1
+            for key in keys:
+                last[(match_id, key)] = t
+    return total, per_channel
+
+
+def test_simulate_alerts_matches_scalar_dedup() -> None:
+    rng = random.Random(5)
+    rows = _random_rows(rng, "ABCD", 800)
+    columns = _build_columns(rows)
+    thresholds = np.array([rng.randint(-1, 6) for _ in columns.match_ids], dtype=np.int64)
+    intervals = np.array([rng.choice([0, 10, 45, 120]) for _ in columns.match_ids], dtype=np.int64)
+
+    fired = simulate_alerts(columns, thresholds, intervals)
+
+    expected = []
+    last: Dict[int, float] = {}
+    for i, (code, t, seats) in enumerate(zip(columns.codes.tolist(), columns.times.tolist(), columns.seats.tolist())):
+        if thresholds[code] < 0 or seats < thresholds[code]:
+            continue
+        if intervals[code] > 0 and code in last and last[code] >= t - intervals[code]:
+            continue
+        expected.append(i)
+        last[code] = t
+    assert fired.tolist() == expected
+
+
+def test_replay_dedups_per_match_and_channel() -> None:
+    rng = random.Random(9)
+    for _ in range(200):
+        rows = _random_rows(rng, "AB", rng.randint(1, 150))
+        monitors = [
+            MonitorConfig(
+                name=f"m{i}",
+                match_id=rng.choice("AB"),
+                channels=rng.sample(["slack", "email", "console"], rng.randint(1, 2)),
+                seat_threshold_min=rng.randint(0, 9),
+                min_notify_interval_seconds=rng.choice([0, 5, 30, 100]),
+            )
+            for i in range(rng.randint(1, 5))
+        ]
+        result = replay(_build_columns(rows), monitors)[0]
+        assert (result.alerts, result.alerts_per_channel) == _reference(rows, monitors)
+
+
+def test_replay_dedups_by_notifier_type_and_reports_by_name() -> None:
+    rows = [("A", float(t), 8) for t in range(0, 300, 10)]
+    monitors = [
+        MonitorConfig(name="ops", match_id="A", channels=["ops_slack"], min_notify_interval_seconds=100),
+        MonitorConfig(name="fans", match_id="A", channels=["fans_slack"], min_notify_interval_seconds=100),
+    ]
+    types = {"ops_slack": "slack", "fans_slack": "slack"}
+
+    result = replay(_build_columns(rows), monitors, channel_types=types)[0]
+
+    # Both names are Slack notifiers, so live they share one dedup slot: at t=0, 110
+    # and 220 only "ops" (first in config order) gets through
+    assert result.alerts == 3
+    assert result.alerts_per_channel == {"ops_slack": 3, "fans_slack": 0}
+    assert replay(_build_columns(rows), monitors)[0].alerts == 6
+
+
+def test_replay_dedup_by_type_matches_scalar_reference() -> None:
+    rng = random.Random(13)
+    types = {"ops_slack": "slack", "fans_slack": "slack", "oncall": "email", "stdout": "console"}
+    for _ in range(200):
+        rows = _random_rows(rng, "AB", rng.randint(1, 150))
+        monitors = [
+            MonitorConfig(
+                name=f"m{i}",
+                match_id=rng.choice("AB"),
+                channels=rng.sample(sorted(types), rng.randint(1, 2)),
+                seat_threshold_min=rng.randint(0, 9),
+                min_notify_interval_seconds=rng.choice([0, 5, 30, 100]),
+            )
+            for i in range(rng.randint(1, 5))
+        ]
+        result = replay(_build_columns(rows), monitors, channel_types=types)[0]
+        assert (result.alerts, result.alerts_per_channel) == _reference(rows, monitors, types)
+
+
+def test_replay_skips_monitors_it_cannot_model() -> None:
+    rows = [("A", float(t), s) for t, s in enumerate([0, 3, 5, 1, 6])]
+    monitors = [
+        MonitorConfig(name="rules", match_id="A", channels=["a"], rules=["seats >= 6", "seats >= 5"]),
+        MonitorConfig(name="edge", match_id="A", channels=["b"], rules=["cross above 4"]),
+        MonitorConfig(name="stand", match_id="A", channels=["c"], sections=["North*"]),
+    ]
+    result = replay(_build_columns(rows), monitors, intervals=[0])[0]
+    # 'seats >= 6' or 'seats >= 5' fires at the lower of the two
+    assert result.alerts_per_channel == {"a": 2, "b": 0, "c": 0}
+    assert result.skipped_monitors == ["edge", "stand"]
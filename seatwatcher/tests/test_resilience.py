@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from seatwatcher.providers import resilience
+from seatwatcher.providers.base import SeatProvider
+from seatwatcher.providers.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientProvider,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    fake = _Clock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+
+def _breaker(**overrides: float) -> CircuitBreaker:
+    options = dict(
+        window_size=4,
+        min_calls=4,
+        error_rate_threshold=0.5,
+        slow_call_seconds=1.0,
+        slow_call_rate_threshold=0.75,
+        open_seconds=30.0,
+        half_open_max_calls=1,
+    )
+    options.update(overrides)
+    return CircuitBreaker("upstream", **options)  # type: ignore[arg-type]
+
+
+def _call(breaker: CircuitBreaker, success: bool = True, latency: float = 0.1) -> None:
+    breaker.before_call()
+    breaker.record(success, latency)
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for success in (True, True, False, False):
+        _call(breaker, success)
+    assert breaker.state == OPEN
+
+
+def test_breaker_stays_closed_until_min_calls(clock: _Clock) -> None:
+    breaker = _breaker()
+    for _ in range(3):
+        _call(breaker, success=False)
+    assert breaker.state == CLOSED
+    _call(breaker, success=False)
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_breaker_opens_on_slow_call_rate(clock: _Clock) -> None:
+    breaker = _breaker()
+    for latency in (2.0, 2.0, 0.1):
+        _call(breaker, latency=latency)
+    assert breaker.state == CLOSED
+    _call(breaker, latency=1.0)
+    assert breaker.state == OPEN
+
+
+def test_open_breaker_rejects_until_open_seconds_pass(clock: _Clock) -> None:
+    breaker = _breaker()
+    _trip(breaker)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 29.9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["rejected_calls"] == 2
+
+    clock.now += 0.1
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+
+def test_half_open_limits_probes_and_closes_after_enough_successes(clock: _Clock) -> None:
+    breaker = _breaker(half_open_max_calls=2)
+    _trip(breaker)
+    clock.now += 30
+
+    breaker.before_call()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == HALF_OPEN
+    # A finished probe frees its slot
+    breaker.before_call()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+@pytest.mark.parametrize("success, latency", [(False, 0.1), (True, 5.0)])
+def test_failed_or_slow_probe_reopens(clock: _Clock, success: bool, latency: float) -> None:
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+
+    breaker.before_call()
+    breaker.record(success, latency)
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_late_result_from_before_opening_is_ignored(clock: _Clock) -> None:
+    breaker = _breaker()
+    breaker.before_call()  # still in flight when the circuit opens
+    _trip(breaker)
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+
+
+def test_release_frees_a_probe_slot(clock: _Clock) -> None:
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+class _Scripted(SeatProvider):
+    """Answers call ``i`` after ``delays[i]`` seconds, or raises if ``errors[i]`` is set."""
+
+    def __init__(self, delays: List[float], errors: Optional[List[Optional[Exception]]] = None) -> None:
+        self._delays = delays
+        self._errors = errors or [None] * len(delays)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        i = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._delays[i])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        error = self._errors[i]
+        if error is not None:
+            raise error
+        return i
+
+
+def test_cancelled_probe_releases_its_slot(clock: _Clock) -> None:
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+    provider = ResilientProvider(_Scripted([10.0, 0.0]), breaker=breaker)
+
+    async def scenario() -> int:
+        probe = asyncio.create_task(provider.fetch_available_seats("A"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(CircuitOpenError):
+            await provider.fetch_available_seats("A")
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        return await provider.fetch_available_seats("A")
+
+    assert asyncio.run(scenario()) == 1
+    assert breaker.state == CLOSED
+
+
+def test_provider_errors_count_against_the_breaker() -> None:
+    breaker = _breaker(min_calls=2, window_size=2)
+    provider = ResilientProvider(_Scripted([0.0, 0.0], [RuntimeError("boom"), RuntimeError("boom")]), breaker=breaker)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await provider.fetch_available_seats("A")
+        with pytest.raises(CircuitOpenError):
+            await provider.fetch_available_seats("A")
+
+    asyncio.run(scenario())
+    assert provider.stats()["circuit"]["state"] == OPEN
+
+
+def _hedging(inner: _Scripted, breaker: Optional[CircuitBreaker] = None) -> ResilientProvider:
+    return ResilientProvider(
+        inner,
+        breaker=breaker,
+        hedge=True,
+        hedge_percentile=0.95,
+        hedge_min_delay_seconds=0.05,
+        hedge_min_samples=2,
+    )
+
+
+def test_no_hedging_before_min_samples() -> None:
+    inner = _Scripted([0.15])
+    provider = _hedging(inner)
+
+    assert asyncio.run(provider.fetch_available_seats("A")) == 0
+    assert inner.calls == 1
+    assert provider.stats()["hedges_sent"] == 0
+
+
+def test_hedge_that_answers_first_wins_and_cancels_the_primary() -> None:
+    # Two fast calls prime the latency sample, then a stuck primary is hedged
+    inner = _Scripted([0.0, 0.0, 5.0, 0.0])
+    provider = _hedging(inner)
+
+    async def scenario() -> List[int]:
+        return [await provider.fetch_available_seats("A") for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [0, 1, 3]
+    stats = provider.stats()
+    assert (stats["hedges_sent"], stats["hedge_wins"], stats["hedge_win_rate"]) == (1, 1, 1.0)
+    assert inner.cancelled == 1
+
+
+def test_primary_that_answers_first_is_not_a_hedge_win() -> None:
+    inner = _Scripted([0.0, 0.0, 0.1, 5.0])
+    provider = _hedging(inner)
+
+    async def scenario() -> List[int]:
+        return [await provider.fetch_available_seats("A") for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+    stats = provider.stats()
+    assert (stats["hedges_sent"], stats["hedge_wins"]) == (1, 0)
+    assert inner.cancelled == 1
+
+
+def test_hedged_call_fails_only_when_both_attempts_fail() -> None:
+    # The primary fails after the hedge was sent but before the hedge answers
+    inner = _Scripted([0.0, 0.0, 0.08, 0.1], [None, None, RuntimeError("primary"), None])
+    provider = _hedging(inner)
+
+    async def scenario() -> int:
+        for _ in range(2):
+            await provider.fetch_available_seats("A")
+        return await provider.fetch_available_seats("A")
+
+    assert asyncio.run(scenario()) == 3
+    assert provider.stats()["hedge_wins"] == 1
+
+    inner = _Scripted([0.0, 0.0, 0.1, 0.2], [None, None, RuntimeError("primary"), RuntimeError("hedge")])
+    provider = _hedging(inner)
+
+    async def failing() -> None:
+        for _ in range(2):
+            await provider.fetch_available_seats("A")
+        with pytest.raises(RuntimeError, match="hedge"):
+            await provider.fetch_available_seats("A")
+
+    asyncio.run(failing())
+    assert provider.stats()["hedge_wins"] == 0
+
+
+def test_no_hedging_while_the_breaker_is_probing(clock: _Clock) -> None:
+    breaker = _breaker()
+    inner = _Scripted([0.0, 0.0, 0.15])
+    provider = _hedging(inner, breaker)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            await provider.fetch_available_seats("A")
+        _trip(breaker)
+        clock.now += 30
+        assert await provider.fetch_available_seats("A") == 2
+
+    asyncio.run(scenario())
+    assert inner.calls == 3
+    assert provider.stats()["hedges_sent"] == 0
+    assert breaker.state == CLOSED
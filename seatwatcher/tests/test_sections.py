@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from typing import Dict
+
+import httpx
+import numpy as np
+import pytest
+
+from seatwatcher.config import Config
+from seatwatcher.providers.base import SectionSnapshot
+from seatwatcher.providers.http_json import HttpJsonProvider
+from seatwatcher.utils.sections import (
+    aggregate_sections,
+    decode_sections,
+    encode_sections,
+    section_matcher,
+    section_matrix,
+)
+from seatwatcher.watcher import Observed, WatcherService
+
+
+VENUE = {f"Block {stand} {i:02d}": (i * 7) % 40 for stand in ("North", "South", "East", "West") for i in range(15)}
+
+
+@pytest.mark.parametrize(
+    "sections, version",
+    [({"A": 5}, 1), ({}, 1), (VENUE, 2), ({"Tribüne": 0, "Gäste": 2**31 - 1}, 1)],
+)
+def test_round_trip_raw_and_compressed(sections: Dict[str, int], version: int) -> None:
+    blob = encode_sections(sections)
+    assert blob[0] == version
+    assert decode_sections(blob) == sections
+
+
+def test_compressed_venue_is_small() -> None:
+    assert len(encode_sections(VENUE)) < 300
+
+
+@pytest.mark.parametrize(
+    "blob, message",
+    [
+        (b"", "empty"),
+        (bytes([9]) + encode_sections({"A": 1})[1:], "unsupported sections blob version 9"),
+        (encode_sections({"A": 1})[:3], "corrupt"),
+        (encode_sections({"A": 1, "B": 2})[:-1], "corrupt"),
+        (bytes([2]) + b"not zlib", "corrupt"),
+        (encode_sections(VENUE)[:-5], "corrupt"),
+    ],
+)
+def test_bad_blobs_raise_value_error(blob: bytes, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        decode_sections(blob)
+    if blob:
+        with pytest.raises(ValueError):
+            section_matrix([blob])
+
+
+def test_section_matrix_fills_missing_sections_and_rows_with_zero() -> None:
+    blobs = [encode_sections({"B": 2, "A": 1}), None, encode_sections({"C": 3}), b"", encode_sections(VENUE)]
+
+    columns, matrix = section_matrix(blobs)
+
+    assert columns == sorted({"A", "B", "C", *VENUE})
+    assert matrix.shape == (5, len(columns)) and matrix.dtype == np.int32
+    row = dict(zip(columns, matrix[0].tolist()))
+    assert (row["A"], row["B"], row["C"]) == (1, 2, 0)
+    assert not matrix[1].any() and not matrix[3].any()
+    assert matrix[2].sum() == 3
+    assert dict(zip(columns, matrix[4].tolist())) == {name: VENUE.get(name, 0) for name in columns}
+
+
+def test_section_matrix_of_nothing() -> None:
+    columns, matrix = section_matrix([])
+    assert columns == [] and matrix.shape == (0, 0)
+
+
+def test_aggregate_sections() -> None:
+    sections = {"North A": 4, "North B": 0, "South A": 9, "East": 2}
+    north = section_matcher(["North*"])
+
+    assert aggregate_sections(sections) == 15
+    assert aggregate_sections(sections, how="max") == 9
+    assert aggregate_sections(sections, how="nonempty") == 3
+    assert aggregate_sections(sections, north) == 4
+    assert aggregate_sections(sections, north, "max") == 4
+    assert aggregate_sections(sections, north, "nonempty") == 1
+    assert aggregate_sections(sections, section_matcher(["West*"]), "max") == 0
+    assert aggregate_sections(sections, section_matcher(["East", "South ?"])) == 11
+    assert section_matcher([]) is None
+    with pytest.raises(ValueError, match="unknown section aggregate"):
+        aggregate_sections(sections, how="mean")
+
+
+def test_http_json_reports_its_own_total_with_the_sections() -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        # Only two of the venue's stands are listed; the total covers the rest too
+        body = {"available": 120, "stands": [{"name": "North", "free": 30}, {"name": "South", "free": 50}]}
+        return httpx.Response(200, json=body)
+
+    provider = HttpJsonProvider(
+        url_template="http://upstream/matches/$match_id",
+        method="GET",
+        timeout_seconds=1.0,
+        jmespath_expr="available",
+        sections_jmespath="stands[].[name, free]",
+    )
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def scenario() -> SectionSnapshot:
+        try:
+            return await provider.fetch_sections("M1")
+        finally:
+            await provider.aclose()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot == SectionSnapshot(120, {"North": 30, "South": 50})
+    assert len(requests) == 1 and requests[0].url.path == "/matches/M1"
+
+
+class _Stands:
+    sections_supported = True
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        raise AssertionError("section providers are asked for sections")
+
+    async def fetch_sections(self, match_id: str) -> SectionSnapshot:
+        return SectionSnapshot(500, {"North A": 10, "North B": 0, "South": 20})
+
+
+def test_watcher_stores_the_upstream_total_and_evaluates_selected_sections() -> None:
+    cfg = Config(
+        app={"log_level": "WARNING"},
+        database={"url": "sqlite://"},
+        provider={"type": "simulation", "simulation": {"scenario": {"profiles": [{"name": "p", "sections": ["N"]}]}}},
+        notifiers={"console": {"type": "console"}},
+        monitors=[{"name": "m", "match_id": "A", "channels": ["console"], "sections": ["North*"]}],
+    )
+    service = WatcherService(cfg)
+    runtime = dataclasses.replace(service._runtimes[0], provider=_Stands())
+
+    async def scenario() -> Observed:
+        task = asyncio.create_task(service._run_monitor(runtime))
+        try:
+            return await asyncio.wait_for(service._pending.get(), timeout=2)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    observed = asyncio.run(scenario())
+    assert (observed.seats, observed.total) == (10, 500)
+    assert observed.sections_blob is not None
+    assert decode_sections(observed.sections_blob) == {"North A": 10, "North B": 0, "South": 20}
+    assert service.history.latest("A") is not None and service.history.latest("A")[1] == 500
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Dict, List, Sequence, Tuple
+
+from seatwatcher.config import ScenarioConfig
+from seatwatcher.providers.simulation import SimulationProvider
+
+
+WATCHED = [f"M{i}" for i in range(12)]
+TIMES = [0.0, 7.5, 60.0, 299.0, 301.0, 900.0, 1800.0, 3599.0, 7200.0]
+
+
+def _scenario(seed: int = 3) -> ScenarioConfig:
+    return ScenarioConfig(
+        seed=seed,
+        release_slot_seconds=120,
+        profiles=[
+            {"name": "sellout", "weight": 2, "release_rate_per_hour": 20, "release_sellout_seconds": 400},
+            {"name": "steady", "kind": "steady", "sections": ["North", "South", "East"], "noise": 0.05},
+            {"name": "pinned", "kind": "sold_out", "match_ids": ["M1*"], "release_rate_per_hour": 30},
+        ],
+        # No sleeping: only the outcome of each request matters here
+        latency={"median_ms": 0, "tail_probability": 0},
+        faults={"error_rate": 0.3},
+    )
+
+
+def _outcomes(provider: SimulationProvider, order: Sequence[str], rounds: int) -> Dict[str, List[str]]:
+    """Poll ``order`` for ``rounds`` rounds; per match, whether each request failed."""
+    seen: Dict[str, List[str]] = {}
+
+    async def poll() -> None:
+        for _ in range(rounds):
+            for match_id in order:
+                try:
+                    await provider.fetch_available_seats(match_id)
+                    outcome = "ok"
+                except Exception as exc:  # noqa: BLE001
+                    outcome = type(exc).__name__
+                seen.setdefault(match_id, []).append(outcome)
+
+    asyncio.run(poll())
+    return seen
+
+
+def _curves(provider: SimulationProvider) -> Dict[str, Tuple[List[int], List[Dict[str, int]]]]:
+    return {
+        m: ([provider.seats_at(m, t) for t in TIMES], [provider.sections_at(m, t) for t in TIMES]) for m in WATCHED
+    }
+
+
+def test_matches_do_not_depend_on_poll_order_or_match_count() -> None:
+    alone = SimulationProvider(_scenario())
+    alone_outcomes = _outcomes(alone, WATCHED, rounds=20)
+
+    crowded = SimulationProvider(_scenario())
+    others = [f"X{i}" for i in range(300)]
+    order = WATCHED + others
+    random.Random(1).shuffle(order)
+    crowded_outcomes = _outcomes(crowded, list(reversed(order)), rounds=20)
+
+    for m in WATCHED:
+        assert crowded_outcomes[m] == alone_outcomes[m], m
+    assert _curves(crowded) == _curves(alone)
+
+
+def test_curves_do_not_depend_on_which_matches_were_seen_first() -> None:
+    forward = SimulationProvider(_scenario())
+    backward = SimulationProvider(_scenario())
+    for m in reversed(WATCHED):
+        backward.sections_at(m, 1000.0)
+    assert _curves(backward) == _curves(forward)
+
+
+def test_explicit_seed_overrides_the_scenario_seed() -> None:
+    assert _curves(SimulationProvider(_scenario(seed=99), seed=3)) == _curves(SimulationProvider(_scenario(seed=3)))
+    assert _curves(SimulationProvider(_scenario(seed=4))) != _curves(SimulationProvider(_scenario(seed=3)))
+
+
+def test_scenario_exercises_faults_and_sections() -> None:
+    provider = SimulationProvider(_scenario())
+    outcomes = _outcomes(provider, WATCHED, rounds=20)
+    flat = [o for seq in outcomes.values() for o in seq]
+    assert "ok" in flat and "SimulatedUpstreamError" in flat
+    for m in WATCHED:
+        for t in TIMES:
+            assert sum(provider.sections_at(m, t).values()) == provider.seats_at(m, t)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Awaitable, Callable, List, Tuple
+
+from seatwatcher.providers.base import SeatUpdate
+from seatwatcher.providers.sse import SseProvider, _PendingUpdates
+from seatwatcher.utils.httpserver import Request, Response, start_http_server
+
+
+def _event(data: object, event_id: str | None = None, retry_ms: int | None = None) -> str:
+    lines = []
+    if retry_ms is not None:
+        lines.append(f"retry: {retry_ms}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _stream(*events: str) -> Response:
+    # The stand-in sends the events and closes, which the client sees as a dropped stream
+    return Response(200, "".join(events).encode("utf-8"), content_type="text/event-stream")
+
+
+async def _serve(handler: Callable[[Request], Awaitable[Response]]) -> Tuple[asyncio.AbstractServer, str]:
+    server = await start_http_server(handler, host="127.0.0.1", port=0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+async def _take(provider: SseProvider, match_ids: List[str], batches: int) -> List[List[SeatUpdate]]:
+    received: List[List[SeatUpdate]] = []
+    stream = provider.stream(match_ids)
+    try:
+        async for batch in stream:
+            received.append(batch)
+            if len(received) == batches:
+                break
+    finally:
+        await stream.aclose()
+    return received
+
+
+class _FixedProvider:
+    def __init__(self, seats: int) -> None:
+        self.seats = seats
+        self.calls: List[str] = []
+
+    async def fetch_available_seats(self, match_id: str) -> int:
+        self.calls.append(match_id)
+        return self.seats
+
+
+def test_reconnect_resumes_from_last_event_id_and_honours_retry() -> None:
+    requests: List[Request] = []
+    scripted = [
+        _stream(_event({"match_id": "A", "seats": 3}, event_id="1", retry_ms=20)),
+        _stream(_event([{"match_id": "A", "seats": 5}, {"match_id": "B", "seats": 1}], event_id="2")),
+    ]
+
+    async def handler(request: Request) -> Response:
+        requests.append(request)
+        return scripted[len(requests) - 1] if len(requests) <= len(scripted) else _stream()
+
+    async def scenario() -> None:
+        server, base = await _serve(handler)
+        try:
+            # Without the server's retry: the reconnect would wait 5s and time out
+            provider = SseProvider(url_template=f"{base}/stream?matches=$match_ids", reconnect_initial_seconds=5)
+            batches = await asyncio.wait_for(_take(provider, ["A", "B"], 2), timeout=3)
+        finally:
+            server.close()
+        assert batches == [[("A", 3)], [("A", 5), ("B", 1)]]
+        assert requests[0].query["matches"] == "A,B"
+        assert "last-event-id" not in requests[0].headers
+        assert requests[1].headers["last-event-id"] == "1"
+        assert await provider.fetch_available_seats("A") == 5
+
+    asyncio.run(scenario())
+
+
+def test_fallback_is_polled_while_stream_is_down() -> None:
+    async def handler(request: Request) -> Response:
+        return Response.json(503, {"error": "unavailable"})
+
+    async def scenario() -> None:
+        server, base = await _serve(handler)
+        fallback = _FixedProvider(7)
+        try:
+            provider = SseProvider(
+                url_template=f"{base}/stream?matches=$match_ids",
+                reconnect_initial_seconds=0.05,
+                fallback=fallback,  # type: ignore[arg-type]
+                fallback_after_seconds=0,
+                fallback_interval_seconds=0.05,
+            )
+            batches = await asyncio.wait_for(_take(provider, ["A", "B"], 1), timeout=3)
+        finally:
+            server.close()
+        assert batches == [[("A", 7), ("B", 7)]]
+        assert await provider.fetch_available_seats("B") == 7
+
+    asyncio.run(scenario())
+
+
+def test_long_subscriptions_are_split_across_connections() -> None:
+    match_ids = [f"MATCH-{i:04d}" for i in range(60)]
+    requests: List[Request] = []
+
+    async def handler(request: Request) -> Response:
+        requests.append(request)
+        ids = request.query["matches"].split(",")
+        return _stream(_event([{"match_id": m, "seats": 1} for m in ids]))
+
+    async def scenario() -> None:
+        server, base = await _serve(handler)
+        try:
+            provider = SseProvider(url_template=f"{base}/stream?matches=$match_ids", max_url_length=256)
+            urls = [sub.url for sub in provider._subscriptions(match_ids)]
+            seen: set[str] = set()
+            stream = provider.stream(match_ids)
+            try:
+                # Updates from several connections may arrive coalesced into one batch
+                while len(seen) < len(match_ids):
+                    batch = await asyncio.wait_for(stream.__anext__(), timeout=3)
+                    seen.update(m for m, _ in batch)
+            finally:
+                await stream.aclose()
+        finally:
+            server.close()
+        assert len(urls) > 1
+        assert all(len(url) <= 256 for url in urls)
+        assert sorted(seen) == match_ids
+        assert sorted(r.query["matches"] for r in requests[: len(urls)]) == sorted(url.split("=")[1] for url in urls)
+
+    asyncio.run(scenario())
+
+
+def test_pending_updates_keep_only_the_latest_value_per_match() -> None:
+    async def scenario() -> None:
+        pending = _PendingUpdates()
+        # A consumer that fell behind finds one value per match, not the whole backlog
+        for seats in range(1000):
+            pending.put([("A", seats), ("B", 1000 - seats)])
+        pending.put([("C", 1)])
+        assert await asyncio.wait_for(pending.get(), timeout=1) == [("A", 999), ("B", 1), ("C", 1)]
+        getter = asyncio.ensure_future(pending.get())
+        await asyncio.sleep(0.01)
+        assert not getter.done()
+        pending.put([("A", 0)])
+        assert await asyncio.wait_for(getter, timeout=1) == [("A", 0)]
+
+    asyncio.run(scenario())
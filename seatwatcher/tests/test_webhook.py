@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+import socket
+
+import httpx
+import pytest
+
+from seatwatcher.providers.webhook import WebhookProvider
+
+
+SECRET = "test-secret"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _signed(body: bytes) -> dict[str, str]:
+    return {"X-Seatwatcher-Signature": "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()}
+
+
+async def _post(client: httpx.AsyncClient, url: str, body: bytes, headers: dict[str, str]) -> httpx.Response:
+    # The receiver starts listening on the stream's first iteration
+    for _ in range(100):
+        try:
+            return await client.post(url, content=body, headers=headers)
+        except httpx.ConnectError:
+            await asyncio.sleep(0.02)
+    raise AssertionError(f"webhook receiver never came up at {url}")
+
+
+def test_signed_updates_are_accepted_and_bad_requests_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TEST_WEBHOOK_SECRET", SECRET)
+    port = _free_port()
+    provider = WebhookProvider(host="127.0.0.1", port=port, hmac_secret_env="TEST_WEBHOOK_SECRET", max_queue_batches=1)
+    url = f"http://127.0.0.1:{port}/webhook/seats"
+    body = json.dumps({"updates": [{"match_id": "A", "seats": 4}]}).encode()
+
+    async def scenario() -> None:
+        stream = provider.stream(["A"])
+        first = asyncio.ensure_future(stream.__anext__())
+        async with httpx.AsyncClient() as client:
+            try:
+                unsigned = await _post(client, url, body, {})
+                assert unsigned.status_code == 401
+
+                tampered = await _post(client, url, body.replace(b"4", b"9"), _signed(body))
+                assert tampered.status_code == 401
+
+                malformed = b'{"updates": [{"match_id": "A"}]}'
+                bad = await _post(client, url, malformed, _signed(malformed))
+                assert bad.status_code == 400
+
+                accepted = await _post(client, url, body, _signed(body))
+                assert accepted.status_code == 202
+                assert await asyncio.wait_for(first, timeout=2) == [("A", 4)]
+                assert await provider.fetch_available_seats("A") == 4
+
+                # The consumer is now paused at the yield: one batch fits the queue,
+                # the next is turned away so the partner retries later
+                assert (await _post(client, url, body, _signed(body))).status_code == 202
+                full = await _post(client, url, body, _signed(body))
+                assert full.status_code == 429
+                assert full.headers["retry-after"] == "1"
+            finally:
+                first.cancel()
+                await asyncio.gather(first, return_exceptions=True)
+                await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("seats", [-1, 2**31, 3_000_000_000])
+def test_out_of_range_seats_are_rejected(seats: int) -> None:
+    port = _free_port()
+    provider = WebhookProvider(host="127.0.0.1", port=port)
+    body = json.dumps([{"match_id": "A", "seats": seats}]).encode()
+
+    async def scenario() -> None:
+        stream = provider.stream(["A"])
+        first = asyncio.ensure_future(stream.__anext__())
+        async with httpx.AsyncClient() as client:
+            try:
+                response = await _post(client, f"http://127.0.0.1:{port}/webhook/seats", body, {})
+                assert response.status_code == 400
+                assert "between 0 and" in response.json()["error"]
+                assert not first.done()
+            finally:
+                first.cancel()
+                await asyncio.gather(first, return_exceptions=True)
+                await stream.aclose()
+
+    asyncio.run(scenario())